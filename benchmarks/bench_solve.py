@@ -0,0 +1,97 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+
+Benchmarks of :func:`contique.solve` (run with ``asv run`` or ``asv dev``). Each
+suite reports the wall time, the peak memory and the number of residual calls per
+step of a continuation.
+"""
+
+from collections import deque
+
+import contique
+
+from .problems import bratu_kwargs, spiral_kwargs, tiny_kwargs
+
+
+def run(kwargs):
+    "Run a continuation without keeping the results."
+
+    deque(contique.solve(**kwargs), maxlen=0)
+
+
+def residual_calls_per_step(kwargs):
+    "Return the number of residual calls per (accepted) step of a continuation."
+
+    profiler = contique.Profiler()
+    path = contique.ContinuationPath(contique.solve(profile=profiler, **kwargs))
+
+    return profiler.counts["residual"] / max(1, len(path) - 1)
+
+
+class Bratu:
+    """The Bratu problem, scaled from n=51 to n=10^5 with a dense or sparse
+    jacobian (the dense jacobian is limited to n=2001)."""
+
+    params = ([51, 501, 2001, 100001], [False, True])
+    param_names = ["n", "sparse"]
+    timeout = 600
+
+    def setup(self, n, sparse):
+        if not sparse and n > 2001:
+            # the dense finite-differences jacobian of this size takes too long
+            raise NotImplementedError
+
+        self.kwargs = bratu_kwargs(n, sparse)
+
+    def time_solve(self, n, sparse):
+        run(self.kwargs)
+
+    def peakmem_solve(self, n, sparse):
+        run(self.kwargs)
+
+    def track_residual_calls_per_step(self, n, sparse):
+        return residual_calls_per_step(self.kwargs)
+
+    track_residual_calls_per_step.unit = "calls/step"
+
+
+class Spiral:
+    "Spirals with many changes of the control component."
+
+    params = ["archimedean", "log", "lituus"]
+    param_names = ["spiral"]
+
+    def setup(self, spiral):
+        self.kwargs = spiral_kwargs(spiral)
+
+    def time_solve(self, spiral):
+        run(self.kwargs)
+
+    def peakmem_solve(self, spiral):
+        run(self.kwargs)
+
+    def track_residual_calls_per_step(self, spiral):
+        return residual_calls_per_step(self.kwargs)
+
+    track_residual_calls_per_step.unit = "calls/step"
+
+
+class Tiny:
+    "Tiny systems (n=1, 2), dominated by the per-step overhead."
+
+    params = [1, 2]
+    param_names = ["n"]
+
+    def setup(self, n):
+        self.kwargs = tiny_kwargs(n)
+
+    def time_solve(self, n):
+        run(self.kwargs)
+
+    def peakmem_solve(self, n):
+        run(self.kwargs)
+
+    def track_residual_calls_per_step(self, n):
+        return residual_calls_per_step(self.kwargs)
+
+    track_residual_calls_per_step.unit = "calls/step"
@@ -0,0 +1,150 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+
+Problems of the benchmarks.
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+def bratu(x, lpf):
+    "Finite-differences discretization of the one-dimensional Bratu problem."
+
+    h = 1 / (len(x) - 1)
+    f = np.empty_like(x)
+    f[1:-1] = (x[:-2] - 2 * x[1:-1] + x[2:]) / h**2 + lpf * np.exp(x[1:-1])
+    f[[0, -1]] = x[[0, -1]]
+    return f
+
+
+def bratu_sparsity(n):
+    "Tridiagonal sparsity pattern of the jacobian of the Bratu problem."
+
+    return sparse.diags([1, 1, 1], [-1, 0, 1], shape=(n, n), dtype=bool)
+
+
+def archimedean_spiral(x, lpf, a):
+    r = a * lpf
+    return np.array([-x[0] + r * np.cos(lpf), -x[1] + r * np.sin(lpf)])
+
+
+def log_spiral(x, lpf):
+    r = np.exp(0.1 * lpf)
+    return np.array([-x[0] + r * np.cos(lpf), -x[1] + r * np.sin(lpf)])
+
+
+def lituus_spiral(x, lpf, a):
+    r = a / np.sqrt(lpf)
+    return np.array([-x[0] + r * np.cos(lpf), -x[1] + r * np.sin(lpf)])
+
+
+def sin(x, lpf, a, b):
+    return np.array([-(a + b * x[0]) * np.sin(x[0]) + lpf])
+
+
+def sincos(x, lpf, a, b):
+    return np.array(
+        [-a * np.sin(x[0]) + x[1] ** 2 + lpf, -b * np.cos(x[1]) * x[1] + lpf]
+    )
+
+
+def bratu_kwargs(n, sparse):
+    "Keyword-arguments of the Bratu benchmark with n unknowns."
+
+    kwargs = dict(
+        fun=bratu,
+        x0=np.zeros(n),
+        lpf0=0.0,
+        dxmax=0.5,
+        dlpfmax=0.5,
+        maxsteps=10,
+        maxiter=20,
+        tol=1e-8 * np.sqrt(n),
+        reporter=None,
+    )
+
+    if sparse:
+        kwargs["jacsparsity"] = bratu_sparsity(n)
+
+    return kwargs
+
+
+def spiral_kwargs(spiral):
+    "Keyword-arguments of the spiral benchmarks (many control switches)."
+
+    if spiral == "archimedean":
+        return dict(
+            fun=archimedean_spiral,
+            x0=np.zeros(2),
+            args=(1,),
+            lpf0=0.0,
+            dxmax=0.2,
+            dlpfmax=0.2,
+            maxsteps=500,
+            tol=1e-10,
+            overshoot=1.05,
+            reporter=None,
+        )
+
+    if spiral == "log":
+        return dict(
+            fun=log_spiral,
+            x0=np.array([1.0, 0.0]),
+            lpf0=0.0,
+            dxmax=0.1,
+            dlpfmax=0.1,
+            maxsteps=500,
+            tol=1e-10,
+            overshoot=1.05,
+            reporter=None,
+        )
+
+    return dict(
+        fun=lituus_spiral,
+        x0=lituus_spiral(np.zeros(2), 0.2, 1),
+        args=(1,),
+        lpf0=0.2,
+        control0=(2, 1),
+        dxmax=0.2,
+        dlpfmax=0.2,
+        jaceps=1e-4,
+        maxsteps=500,
+        maxiter=20,
+        tol=1e-12,
+        overshoot=1.05,
+        reporter=None,
+    )
+
+
+def tiny_kwargs(n):
+    "Keyword-arguments of the benchmarks of tiny systems with n = 1 or 2 unknowns."
+
+    if n == 1:
+        return dict(
+            fun=sin,
+            x0=np.zeros(1),
+            args=(1, 0.3),
+            lpf0=0.0,
+            dxmax=0.2,
+            dlpfmax=0.2,
+            maxsteps=500,
+            tol=1e-10,
+            overshoot=1.0,
+            rebalance=True,
+            reporter=None,
+        )
+
+    return dict(
+        fun=sincos,
+        x0=np.zeros(2),
+        args=(1, 1),
+        lpf0=0.0,
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=500,
+        maxiter=20,
+        tol=1e-8,
+        overshoot=1.05,
+        reporter=None,
+    )
@@ -1,9 +1,26 @@
+from . import io
 from .__about__ import __version__
-from .jacobian import jacobian
+from .batch import solve_batch
+from .jacobian import colorize, jacobian, sparsity
 from .numcont import solve
+from .parallel import solve_many
+from .path import ContinuationPath, Step
+from .profiler import Profiler, Stats, Tracer
+from .solvers import ILUGMRES
 
 __all__ = [
     "__version__",
+    "ContinuationPath",
+    "ILUGMRES",
+    "Profiler",
+    "Stats",
+    "Step",
+    "Tracer",
+    "colorize",
+    "io",
     "jacobian",
     "solve",
+    "solve_batch",
+    "solve_many",
+    "sparsity",
 ]
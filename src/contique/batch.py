@@ -0,0 +1,402 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+"""
+
+import numpy as np
+
+from .path import ContinuationPath
+
+
+def residuals(fun, y, members, args, batched):
+    """Evaluate the vectorized equilibrium equations of selected members.
+
+    Parameters
+    ----------
+    fun : function
+        vectorized function in terms of unknowns x of shape ``(n, k)``, the
+        load-proportionality-factors lpf of shape ``(k,)`` and optional args which
+        returns the equilibrium equations of shape ``(n, k)``.
+    y : ndarray
+        2d-array of extended unknowns of shape ``(k, n + 1)``
+    members : ndarray
+        1d-array of member indices of shape ``(k,)``
+    args : tuple
+        arguments of the function
+    batched : list of bool
+        flags of the arguments with a trailing axis of members
+
+    Returns
+    -------
+    ndarray
+        2d-array of equilibrium equations of shape ``(k, n)``
+    """
+
+    # select the items of the batched arguments
+    args = [arg[..., members] if b else arg for arg, b in zip(args, batched)]
+
+    return np.asarray(fun(y[:, :-1].T, y[:, -1], *args)).T
+
+
+def jacobians(fun, y, members, args, batched, h):
+    """Evaluate the jacobians of the vectorized equilibrium equations of selected
+    members w.r.t. the extended unknowns as central finite-differences by one call
+    of the function.
+
+    Parameters
+    ----------
+    fun : function
+        vectorized function (see :func:`residuals`)
+    y : ndarray
+        2d-array of extended unknowns of shape ``(k, n + 1)``
+    members : ndarray
+        1d-array of member indices of shape ``(k,)``
+    args : tuple
+        arguments of the function
+    batched : list of bool
+        flags of the arguments with a trailing axis of members
+    h : float
+        step-width of the finite-differences
+
+    Returns
+    -------
+    ndarray
+        3d-array of jacobians of shape ``(k, n, n + 1)``
+    """
+
+    k, m = y.shape
+
+    # forward and backward perturbations of all extended unknowns of all members
+    shifts = h * np.eye(m)
+    yp = (y[:, None, None, :] + np.array([shifts, -shifts])[None]).reshape(-1, m)
+
+    f = residuals(fun, yp, np.repeat(members, 2 * m), args, batched)
+    f = f.reshape(k, 2, m, -1)
+
+    return np.transpose(f[:, 0] - f[:, 1], (0, 2, 1)) / (2 * h)
+
+
+def newton(fun, y0, ymax, component, members, args, batched, h, maxiter, tol):
+    """Solve the extended equilibrium equations of selected members in lock step by
+    the Newton-Rhapson method with batched linear solutions.
+
+    Parameters
+    ----------
+    fun : function
+        vectorized function (see :func:`residuals`)
+    y0 : ndarray
+        2d-array of initial extended unknowns of shape ``(k, n + 1)``
+    ymax : ndarray
+        2d-array of the values of the extended unknowns of the control equations
+    component : ndarray
+        1d-array with the control components
+    members : ndarray
+        1d-array of member indices of shape ``(k,)``
+    args : tuple
+        arguments of the function
+    batched : list of bool
+        flags of the arguments with a trailing axis of members
+    h : float
+        step-width of the finite-differences
+    maxiter : int
+        max. number of Newton-iterations
+    tol : float
+        tolerated residual of the norm of the extended equilibrium equations
+
+    Returns
+    -------
+    y : ndarray
+        2d-array of the final extended unknowns (NaN if the linear solution failed)
+    fnorm : ndarray
+        1d-array of the norms of the extended equilibrium equations
+    niterations : ndarray
+        1d-array of the numbers of performed iterations
+    success : ndarray
+        1d-array of flags of the converged members
+    """
+
+    k, m = y0.shape
+    rows = np.arange(k)
+
+    y = y0.copy()
+    f = residuals(fun, y, members, args, batched)
+    g = np.hstack([f, (y[rows, component] - ymax[rows, component])[:, None]])
+
+    fnorm = np.linalg.norm(g, axis=1)
+    niterations = np.zeros(k, dtype=int)
+    success = np.zeros(k, dtype=bool)
+
+    for iteration in range(1, 1 + maxiter):
+        # iterate the members which are neither converged nor failed
+        active = np.flatnonzero(~success & np.isfinite(fnorm))
+
+        if len(active) == 0:
+            break
+
+        # extended jacobians with the one-hot rows of the control equations
+        dgdy = np.zeros((len(active), m, m))
+        dgdy[:, :-1] = jacobians(fun, y[active], members[active], args, batched, h)
+        dgdy[np.arange(len(active)), -1, component[active]] = 1
+
+        # batched linear solutions (one by one if a jacobian is singular)
+        try:
+            dy = np.linalg.solve(dgdy, -g[active, :, None])[..., 0]
+        except np.linalg.LinAlgError:
+            dy = np.full((len(active), m), np.nan)
+            for i, (A, b) in enumerate(zip(dgdy, g[active])):
+                try:
+                    dy[i] = np.linalg.solve(A, -b)
+                except np.linalg.LinAlgError:
+                    pass
+
+        y[active] += dy
+        niterations[active] = iteration
+
+        # extended equilibrium equations at the updated unknowns
+        f = residuals(fun, y[active], members[active], args, batched)
+        g[active, :-1] = f
+        g[active, -1] = y[active, component[active]] - ymax[active, component[active]]
+
+        fnorm[active] = np.linalg.norm(g[active], axis=1)
+        success[active] = fnorm[active] < tol
+
+    return y, np.where(np.isfinite(fnorm), fnorm, np.inf), niterations, success
+
+
+def extrapolate(y0, dy, component, sign, dymax):
+    """Extrapolate the extended unknowns of the members along given increments,
+    scaled to the max. allowed increase of their signed control components (see
+    :func:`contique.numcont.extrapolate`)."""
+
+    rows = np.arange(len(y0))
+    dyj = dy[rows, component]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = y0 + dy * (sign * dymax[component] / dyj)[:, None]
+
+    # fall back to the initial extended unknowns
+    invalid = ~np.all(np.isfinite(y), axis=1)
+    y[invalid] = y0[invalid]
+
+    return y
+
+
+def solve_batch(
+    fun,
+    x0,
+    lpf0,
+    args=(),
+    batched=(),
+    dxmax=0.05,
+    dlpfmax=0.05,
+    control0=(-1, 1),
+    jaceps=None,
+    maxsteps=50,
+    maxcycles=4,
+    maxiter=8,
+    tol=1e-6,
+    overshoot=1.0,
+):
+    """Run the numerical continuations of K small systems of equilibrium equations in
+    lock step. The extended unknowns of all members are carried in an array of shape
+    ``(K, n + 1)``, the vectorized equilibrium equations are evaluated once per
+    iteration (and once per jacobian) for all active members and their extended
+    linear equation systems are solved by a batched linear solution. Per-member
+    masks handle the convergence, the re-cycles with changed control components
+    and the failed steps.
+
+    Parameters
+    ----------
+    fun : function
+        vectorized function in terms of unknowns x of shape ``(n, k)``, the
+        load-proportionality-factors lpf of shape ``(k,)`` and optional args which
+        returns the equilibrium equations of shape ``(n, k)``, see
+        ``contique.solve(vectorized=True)``.
+    x0 : ndarray
+        2d-array of the initial unknowns of shape ``(K, n)``
+    lpf0 : float or ndarray
+        initial load-proportionality-factor(s) of shape ``()`` or ``(K,)``
+    args : tuple, optional
+        arguments of the function (default is ()).
+    batched : tuple of int, optional
+        indices of the batched arguments with a trailing axis of length K, i.e. the
+        items of the active members are passed to the function. All other
+        arguments are passed unchanged (default is ()).
+    dxmax : float, optional
+        max. allowed absolute incremental increase of unknowns (default is 0.05)
+    dlpfmax : float, optional
+        max. allowed absolute incremental increase of the load-proportionality-factor
+        (default is 0.05)
+    control0 : tuple of int, optional
+        initial tuple of control component and sign of all members (default is
+        (-1, 1))
+    jaceps : float, optional
+        step-width of the central finite-differences jacobian (default is
+        eps^(1/3)).
+    maxsteps : int, optional
+        max. number of steps (default is 50)
+    maxcycles : int, optional
+        max. number of cycles per step (default is 4)
+    maxiter : int, optional
+        max. number of Newton-iterations per cycle (default is 8)
+    tol : float, optional
+        tolerated residual of the norm of the extended equilibrium equations
+        (default is 1e-6)
+    overshoot : float, optional
+        tolerated overshoot of the normalized increase of the control component
+        (default is 1.0)
+
+    Returns
+    -------
+    list of ContinuationPath
+        the compact paths of the members. The continuation of a member stops if its
+        Newton-iterations failed or if its control component changed in the last
+        cycle.
+
+    Examples
+    --------
+    >>> def fun(x, lpf, a, b):
+    >>>     return np.array(
+    >>>         [-a * np.sin(x[0]) + x[1] ** 2 + lpf, -b * np.cos(x[1]) * x[1] + lpf]
+    >>>     )
+    >>>
+    >>> a = np.linspace(0.5, 1.5, 10000)
+    >>> paths = contique.solve_batch(
+    >>>     fun, np.zeros((10000, 2)), 0.0, args=(a, 1.0), batched=(0,)
+    >>> )
+
+    """
+
+    x0 = np.atleast_2d(np.asarray(x0, dtype=float))
+    nmembers, n = x0.shape
+    ncomp = n + 1
+
+    if jaceps is None:
+        jaceps = np.finfo(float).eps ** (1 / 3)
+
+    # flags of the batched arguments
+    indices = [index % len(args) for index in batched]
+    batched = [index in indices for index in range(len(args))]
+
+    for arg, flag in zip(args, batched):
+        if flag and (np.ndim(arg) == 0 or np.shape(arg)[-1] != nmembers):
+            raise ValueError("Batched arguments must have a trailing axis of length K.")
+
+    # init y=[x, lpf] combined quantities
+    y0 = np.hstack([x0, np.broadcast_to(lpf0, (nmembers,))[:, None]])
+    dymax = np.append(np.ones(n) * dxmax, dlpfmax)
+
+    # initial control components and signs
+    component = np.full(nmembers, control0[0] % ncomp)
+    sign = np.full(nmembers, control0[1])
+
+    # init the compact paths of all members
+    y = np.full((1 + maxsteps, nmembers, ncomp), np.nan)
+    controls = np.zeros((1 + maxsteps, nmembers, 2), dtype=int)
+    niterations = np.zeros((1 + maxsteps, nmembers), dtype=int)
+    residual_norm = np.zeros((1 + maxsteps, nmembers))
+    status = np.zeros((1 + maxsteps, nmembers), dtype=int)
+    nsteps = np.zeros(nmembers, dtype=int)
+
+    # initial states
+    everyone = np.arange(nmembers)
+    f0 = residuals(fun, y0, everyone, args, batched)
+    y[0] = y0
+    controls[0] = np.column_stack([component, sign])
+    residual_norm[0] = np.linalg.norm(np.hstack([f0, -dymax[component, None]]), axis=1)
+
+    running = np.ones(nmembers, dtype=bool)
+
+    # Step loop.
+    for step in 1 + np.arange(maxsteps):
+        members = np.flatnonzero(running)
+
+        if len(members) == 0:
+            break
+
+        # init the cycles of the running members (which are not yet accepted)
+        yc = y0[members].copy()
+        cycling = np.ones(len(members), dtype=bool)
+
+        # Cycle loop.
+        for cycl in 1 + np.arange(maxcycles):
+            cycle = np.flatnonzero(cycling)
+
+            if len(cycle) == 0:
+                break
+
+            active = members[cycle]
+            rows = np.arange(len(active))
+
+            # Newton Iterations.
+            ymax = y0[active] + sign[active, None] * dymax
+            yn, fnorm, niter, success = newton(
+                fun,
+                yc[cycle],
+                ymax,
+                component[active],
+                active,
+                args,
+                batched,
+                jaceps,
+                maxiter,
+                tol,
+            )
+
+            # final control components based on the normalized increments
+            dys = (yn - y0[active]) / dymax
+            component1 = abs(dys).argmax(axis=1)
+            sign1 = np.sign(dys[rows, component1]).astype(int)
+            within = abs(dys).max(axis=1) <= overshoot
+
+            same = (component1 == component[active]) & (sign1 == sign[active])
+            accepted = success & (same | within)
+            recycled = success & ~accepted
+
+            # Save results of the accepted members, move to next step.
+            index = active[accepted]
+            nsteps[index] = step
+            y[step, index] = yn[accepted]
+            controls[step, index] = np.column_stack(
+                [component1[accepted], sign1[accepted]]
+            )
+            niterations[step, index] = niter[accepted]
+            residual_norm[step, index] = fnorm[accepted]
+            status[step, index] = 1
+
+            y0[index] = yn[accepted]
+            component[index] = component1[accepted]
+            sign[index] = sign1[accepted]
+
+            # stop the members with failed Newton Iterations (or if the max.
+            # number of cycles is reached)
+            stopped = ~success
+            if cycl == maxcycles:
+                stopped |= recycled
+
+            running[active[stopped]] = False
+            cycling[cycle[accepted | stopped]] = False
+
+            # re-cycle with new control components, warm-started from the last
+            # solutions projected to the new control components
+            if np.any(recycled) and cycl < maxcycles:
+                index = active[recycled]
+                component[index] = component1[recycled]
+                sign[index] = sign1[recycled]
+                yc[cycle[recycled]] = extrapolate(
+                    y0[index],
+                    yn[recycled] - y0[index],
+                    component[index],
+                    sign[index],
+                    dymax,
+                )
+
+    return [
+        ContinuationPath.from_arrays(
+            y[: 1 + nsteps[k], k],
+            controls[: 1 + nsteps[k], k],
+            niterations[: 1 + nsteps[k], k],
+            residual_norm[: 1 + nsteps[k], k],
+            status[: 1 + nsteps[k], k],
+        )
+        for k in range(nmembers)
+    ]
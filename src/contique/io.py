@@ -0,0 +1,222 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .path import ContinuationPath
+
+FIELDS = ["y", "control", "niterations", "residual_norm", "status"]
+
+
+class MemmapWriter:
+    """A writer which appends the states of equilibrium in chunks to raw binary files
+    in a directory. The written path is read back by memory-mapping with
+    :func:`contique.io.load`.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the binary files (one file per field and a JSON file
+        ``meta.json`` with the number of written states, data-types and shapes).
+        Existing files are overwritten, also if a continuation is resumed from a
+        checkpoint (see :func:`contique.solve`).
+    chunksize : int, optional
+        Number of states which are buffered in memory before they are written to
+        the files (default is 256).
+
+    Examples
+    --------
+    >>> with contique.io.MemmapWriter("run") as writer:
+    >>>     for res in contique.solve(fun, x0, lpf0, writer=writer):
+    >>>         pass
+    >>>
+    >>> path = contique.io.load("run")
+    >>> path.y
+
+    """
+
+    def __init__(self, path, chunksize=256):
+        self.path = path
+        self.chunksize = chunksize
+        self.length = 0
+        self.buffer = ContinuationPath(capacity=chunksize)
+
+        os.makedirs(path, exist_ok=True)
+
+        for field in FIELDS:
+            open(os.path.join(path, f"{field}.bin"), "wb").close()
+
+        self._write_meta()
+
+    def _write_meta(self):
+        "Write the number of states, the data-types and the shapes per field."
+
+        meta = {"length": self.length, "fields": {}}
+
+        for field in FIELDS:
+            array = getattr(self.buffer, field)
+            meta["fields"][field] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape[1:]),
+            }
+
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    def append(self, res):
+        """Append a result to the buffer and write the buffer to the files if it is
+        full.
+
+        Parameters
+        ----------
+        res : NewtonResult
+            The result of a step with the final extended unknowns ``res.x``.
+        """
+
+        self.buffer.append(res)
+
+        if len(self.buffer) >= self.chunksize:
+            self.flush()
+
+    def flush(self):
+        "Write the buffered states to the files."
+
+        if len(self.buffer) == 0:
+            return
+
+        for field in FIELDS:
+            with open(os.path.join(self.path, f"{field}.bin"), "ab") as f:
+                getattr(self.buffer, field).tofile(f)
+
+        self.length += len(self.buffer)
+        self._write_meta()
+        self.buffer.clear()
+
+    def close(self):
+        "Write the remaining buffered states to the files."
+
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load(path, mode="r"):
+    """Load a path of states of equilibrium, written by :class:`MemmapWriter`, as
+    memory-mapped arrays (without reading the files into memory).
+
+    Parameters
+    ----------
+    path : str
+        The directory of the binary files.
+    mode : str, optional
+        The mode of the memory-mapped arrays (default is "r", read-only).
+
+    Returns
+    -------
+    ContinuationPath
+        The path with memory-mapped arrays.
+    """
+
+    with open(os.path.join(path, "meta.json"), "r") as f:
+        meta = json.load(f)
+
+    length = meta["length"]
+    arrays = []
+
+    for field in FIELDS:
+        dtype = np.dtype(meta["fields"][field]["dtype"])
+        shape = (length, *meta["fields"][field]["shape"])
+
+        if length > 0:
+            array = np.memmap(
+                os.path.join(path, f"{field}.bin"), dtype=dtype, mode=mode, shape=shape
+            )
+        else:
+            array = np.zeros(shape, dtype=dtype)
+
+        arrays.append(array)
+
+    return ContinuationPath.from_arrays(*arrays)
+
+
+def save_checkpoint(path, step, y0, y1, y2, control0, dymax, dymax0, lastfailed):
+    """Save the state of a continuation after a given step to a file. The file is
+    replaced atomically, i.e. an existing checkpoint is not corrupted by an
+    interrupted write.
+
+    Parameters
+    ----------
+    path : str
+        The file of the checkpoint (in NumPy's ``.npz``-format).
+    step : int
+        The number of the last finished step.
+    y0 : ndarray
+        1d-array of the last extended unknowns
+    y1 : ndarray or None
+        1d-array of the previous extended unknowns (used by the secant predictor)
+    y2 : ndarray or None
+        1d-array of the extended unknowns before the previous ones (used by the
+        adaptive step-width)
+    control0 : tuple of int
+        tuple of control component and sign
+    dymax : ndarray
+        1d-array with the (rebalanced) max. allowed incremental increase of unknowns
+    dymax0 : ndarray
+        1d-array with the initial max. allowed incremental increase of unknowns
+    lastfailed : int
+        number of steps since the last failed step (used by the rebalance)
+    """
+
+    tmp = f"{path}.tmp"
+
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            step=step,
+            y0=y0,
+            y1=np.zeros(0) if y1 is None else y1,
+            y2=np.zeros(0) if y2 is None else y2,
+            control0=np.array(control0, dtype=int),
+            dymax=dymax,
+            dymax0=dymax0,
+            lastfailed=lastfailed,
+        )
+
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    """Load the state of a continuation, saved by :func:`save_checkpoint`.
+
+    Parameters
+    ----------
+    path : str
+        The file of the checkpoint (in NumPy's ``.npz``-format).
+
+    Returns
+    -------
+    dict
+        The state of the continuation with the keys ``step``, ``y0``, ``y1``,
+        ``y2``, ``control0``, ``dymax``, ``dymax0`` and ``lastfailed``.
+    """
+
+    with np.load(path) as data:
+        state = {key: data[key] for key in data.files}
+
+    state["step"] = int(state["step"])
+    state["lastfailed"] = int(state["lastfailed"])
+    state["control0"] = [int(c) for c in state["control0"]]
+
+    for key in ["y1", "y2"]:
+        if len(state.get(key, [])) == 0:
+            state[key] = None
+
+    return state
@@ -2,13 +2,125 @@
 contique: Numerical continuation of nonlinear equilibrium equations.
 """
 
-import copy
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
+from scipy import sparse
 
 
-def jacobian(fun, argnum=0, h=None, mode=3):
-    """Decorator for the jacobian as 2- or 3-point finite-differences
+def colorize(sparsity):
+    """Group structurally independent columns of a sparsity pattern by a greedy
+    (Curtis-Powell-Reid) column coloring.
+
+    Parameters
+    ----------
+    sparsity : ndarray or sparse matrix
+        2d-array or sparse matrix of shape ``(nfuns, nargs)``. Non-zero items mark
+        the structurally non-zero entries of the jacobian.
+
+    Returns
+    -------
+    ndarray
+        1d-array of length ``nargs`` with the color (group) of each column. Columns
+        with the same color do not share a common non-zero row.
+    """
+
+    # boolean pattern in compressed sparse column format (the number of shared rows
+    # is counted by int64 to avoid a wrap-around to zero for long columns)
+    pattern = sparse.csc_matrix(sparsity, dtype=bool).astype(np.int64)
+
+    # column intersection graph (columns which share at least one row)
+    graph = (pattern.T @ pattern).tocsr()
+
+    colors = np.full(pattern.shape[1], -1, dtype=int)
+
+    # assign the smallest color which is not used by any neighbour
+    for j in range(pattern.shape[1]):
+        neighbours = graph.indices[graph.indptr[j] : graph.indptr[j + 1]]
+        used = colors[neighbours]
+        used = used[(used >= 0) & (used <= len(neighbours))]
+        taken = np.zeros(len(neighbours) + 1, dtype=bool)
+        taken[used] = True
+        colors[j] = taken.argmin()
+
+    return colors
+
+
+def sparsity(fun, argnum=0, h=None, nprobes=2, seed=0):
+    """Decorator for the detection of the sparsity pattern of the jacobian w.r.t. a
+    1d-array argument by probing each column with a finite perturbation.
+
+    Parameters
+    ----------
+    fun : function
+        Function for which the sparsity pattern of the jacobian should be detected.
+    argnum : int
+        Detect the pattern w.r.t the the selected argument (default is 0).
+    h : float
+        A small relative perturbation (default is eps^(1/3), which is the step-width
+        of the central finite-differences jacobian). Changes of the function below
+        its resolution (one ulp) are not detected, i.e. the perturbation must not
+        be smaller than the step-width of the finite-differences jacobian.
+    nprobes : int
+        Number of probed base points. The first probe is evaluated at the given
+        arguments, all others at randomly shifted values of the selected argument
+        to catch entries which are zero by chance (default is 2).
+    seed : int
+        Seed for the random shifts of the base points (default is 0).
+
+    Returns
+    -------
+    patternwrapper : function
+        Function for the detection of the sparsity pattern of the jacobian of
+        function `fun` w.r.t. given `argnum` as boolean sparse matrix in compressed
+        sparse row format.
+    """
+
+    # set perturbation (not smaller than the step-width of the jacobian)
+    if h is None:
+        h = np.finfo(float).eps ** (1 / 3)
+
+    def patternwrapper(*args, **kwargs):
+        """Detects the sparsity pattern of the jacobian w.r.t. a given argnum."""
+
+        rng = np.random.default_rng(seed)
+        rows = []
+        cols = []
+
+        for probe in range(nprobes):
+            # base point (randomly shifted for all probes except the first one)
+            x0 = np.array(args[argnum], dtype=float).ravel()
+            if probe > 0:
+                x0 += rng.uniform(-1, 1, size=x0.size) * 1e-2 * (1 + abs(x0))
+
+            probeargs = list(args)
+            probeargs[argnum] = x0.reshape(np.shape(args[argnum]))
+            f0 = np.array(fun(*probeargs, **kwargs)).ravel()
+
+            # loop over columns and mark all changed items of the function
+            for j in range(x0.size):
+                x0j = x0[j]
+                x0[j] = x0j + h * (1 + abs(x0j))
+                f = np.ravel(fun(*probeargs, **kwargs))
+                changed = np.flatnonzero((f != f0) & ~(np.isnan(f) & np.isnan(f0)))
+                x0[j] = x0j
+
+                rows.append(changed)
+                cols.append(np.full_like(changed, j))
+
+        rows = np.concatenate(rows).astype(int)
+        cols = np.concatenate(cols).astype(int)
+        data = np.ones(len(rows), dtype=bool)
+
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(f0), x0.size))
+
+    return patternwrapper
+
+
+def jacobian(
+    fun, argnum=0, h=None, mode=3, sparsity=None, vectorized=False, workers=None
+):
+    """Decorator for the jacobian as 2- or 3-point finite-differences or complex-step
     approximation w.r.t. a given argnum and h.
 
     Parameters
@@ -18,69 +130,236 @@ def jacobian(fun, argnum=0, h=None, mode=3):
     argnum : int
         Evaluate the jacobian w.r.t the the selected argument (default is 0).
     h : float
-        A small number (default is 1e-6).
-    mode : int
+        A small number (default is eps^(1/mode) for finite-differences and 1e-20 for
+        the complex-step approximation).
+    mode : int or str
+        Forward (2) or central (3) finite-differences or complex-step ("complex")
+        approximation (default is 3). The complex-step approximation requires a
+        complex-analytic function.
+    sparsity : ndarray or sparse matrix, optional
+        Sparsity pattern of shape ``(nfuns, nargs)`` of the jacobian w.r.t. a 1d-array
+        argument. If given, structurally independent columns are grouped by a column
+        coloring and perturbed together. The jacobian is returned as a sparse matrix
+        in compressed sparse row format (default is None).
+    vectorized : bool, optional
+        If True, the function accepts the selected array argument with an additional
+        trailing axis of stacked states and returns the stacked function values
+        along a trailing axis, e.g. ``fun(x, ...)`` with ``x`` of shape ``(n, k)``
+        returns an array of shape ``(m, k)``. All perturbations are evaluated by one
+        function call. A float argument is perturbed by regular function calls
+        (default is False).
+    workers : int or None, optional
+        Number of threads which evaluate the perturbed columns (or column groups)
+        of a 1d-array argument concurrently. Each thread perturbs a private work
+        copy of the argument. This is useful for (thread-safe) functions which
+        release the GIL. If None, the columns are evaluated serially (default is
+        None).
 
     Returns
     -------
     jacwrapper : function
         Function for the calculation of the jacobian of function `fun`
-        w.r.t. given `argnum`.
+        w.r.t. given `argnum`. An optional keyword-argument ``f0`` with the
+        pre-evaluated function at the given arguments is re-used by the 2-point
+        scheme.
     """
 
+    complexstep = mode == "complex"
+
     # set optimal step-width
     if h is None:
-        h = ((np.finfo(float).eps)) ** (1 / mode)
+        if complexstep:
+            h = 1e-20
+        else:
+            h = ((np.finfo(float).eps)) ** (1 / mode)
 
-    def jacwrapper(*args, **kwargs):
-        """Calculates the jacobian as 2- or 3-point finite-differences
-        approximation w.r.t. a given argnum and h."""
+    # data-type of the perturbed argument and (imaginary) perturbation
+    dtype = complex if complexstep else float
+    step = 1j * h if complexstep else h
+
+    if sparsity is not None:
+        # row- and column-indices of the non-zero entries and column groups
+        pattern = sparse.coo_matrix(sparsity, dtype=bool)
+        colors = colorize(pattern)
+        ncolors = colors.max() + 1 if len(colors) > 0 else 0
+
+    def difference(f, f0):
+        "Return the flattened finite-differences or complex-step quotient."
+
+        if complexstep:
+            return np.imag(f).ravel() / h
+
+        return (np.ravel(f) - np.ravel(f0)) / h / (mode - 1)
+
+    def perturb(args, kwargs, f0, groups):
+        """Return the finite-differences of the given groups of columns, evaluated
+        with a private work copy of the selected argument, along with the shape of
+        the function."""
+
+        # work copy of the selected argument which is perturbed in-place
+        workargs = list(args)
+        workargs[argnum] = work = np.array(args[argnum], dtype=dtype)
+        x = work.reshape(-1)
+
+        dfs = []
+        fshape = None
+
+        for columns in groups:
+            xj = x[columns]
+
+            # copy f because the function may return a view on the work array
+            x[columns] = xj + step
+            f = np.array(fun(*workargs, **kwargs))
+
+            # re-define f0
+            if mode == 3:
+                x[columns] = xj - h
+                f0 = fun(*workargs, **kwargs)
+
+            dfs.append(difference(f, f0))
+            fshape = np.shape(f)
+
+            # restore the perturbed items
+            x[columns] = xj
+
+        return dfs, fshape
+
+    def columns(args, kwargs, f0, groups):
+        """Return the finite-differences of all groups of columns (evaluated by the
+        thread-pool if workers are given) along with the shape of the function."""
+
+        if workers is None or workers < 2 or len(groups) < 2:
+            return perturb(args, kwargs, f0, groups)
+
+        # split the groups into one chunk per worker
+        chunks = np.array_split(np.arange(len(groups)), min(workers, len(groups)))
+
+        # thread-pool for the concurrent evaluation of the perturbed columns
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [
+                executor.submit(perturb, args, kwargs, f0, [groups[i] for i in chunk])
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+
+        return [df for dfs, fshape in results for df in dfs], results[-1][1]
+
+    def sparsewrapper(*args, f0=None, **kwargs):
+        """Calculates the sparse jacobian as 2- or 3-point finite-differences
+        approximation w.r.t. a given argnum and h with grouped columns."""
 
         # pre-evaluate f0 = f(x0) if 2-point scheme is used
-        f0 = fun(*args, **kwargs)
+        if mode == 2:
+            if f0 is None:
+                f0 = fun(*args, **kwargs)
+            f0 = np.ravel(f0)
 
-        # check if arg is an array
-        if isinstance(args[argnum], np.ndarray):
-            # init 2d-jacobian
-            nargs = np.size(args[argnum])
-            nfuns = np.size(f0)
-            jac = np.zeros((nfuns, nargs))
+        # finite-differences of all column groups
+        groups = [np.flatnonzero(colors == color) for color in range(ncolors)]
+        dfs = np.zeros((pattern.shape[0], ncolors))
+
+        if ncolors > 0:
+            dfs[:] = np.column_stack(columns(args, kwargs, f0, groups)[0])
+
+        return scatter(dfs)
+
+    def scatter(dfs):
+        "Scatter the grouped finite-differences to the non-zero entries."
 
-            # loop over columns
-            for j in range(nargs):
-                # copy args and modify item j of 1d-args
-                fwdargs = copy.deepcopy(args)
-                fwdargs[argnum].ravel()[j] = fwdargs[argnum].ravel()[j] + h
+        data = dfs[pattern.row, colors[pattern.col]]
 
-                f = fun(*fwdargs, **kwargs)
+        return sparse.csr_matrix((data, (pattern.row, pattern.col)), pattern.shape)
 
-                # re-define f0
-                if mode == 3:
-                    rvsargs = copy.deepcopy(args)
-                    rvsargs[argnum].ravel()[j] = rvsargs[argnum].ravel()[j] - h
-                    f0 = fun(*rvsargs, **kwargs)
+    def vectorizedwrapper(*args, f0=None, **kwargs):
+        """Calculates the jacobian as 2- or 3-point finite-differences
+        approximation w.r.t. a given argnum and h with all perturbations stacked
+        along a trailing axis and evaluated by one function call."""
+
+        if not isinstance(args[argnum], np.ndarray):
+            return jacwrapper(*args, f0=f0, **kwargs)
+
+        x = np.asarray(args[argnum], dtype=float)
+
+        # perturbations of single columns or of column groups
+        if sparsity is None:
+            directions = h * np.eye(x.size)
+        else:
+            directions = np.zeros((x.size, ncolors))
+            directions[np.arange(x.size), colors] = h
+
+        k = directions.shape[1]
+
+        # imaginary (complex-step), forward and backward (3-point), forward (2-point
+        # with given f0) or base and forward (2-point) states
+        if complexstep:
+            shifts = 1j * directions
+        elif mode == 3:
+            shifts = np.hstack([directions, -directions])
+        elif f0 is not None:
+            shifts = directions
+        else:
+            shifts = np.hstack([np.zeros((x.size, 1)), directions])
+
+        stackedargs = list(args)
+        stackedargs[argnum] = (x.reshape(-1, 1) + shifts).reshape(*x.shape, -1)
+
+        f = np.asarray(fun(*stackedargs, **kwargs))
+        fshape = f.shape[:-1]
+        f = f.reshape(-1, shifts.shape[1])
+
+        if complexstep:
+            dfs = np.imag(f) / h
+        elif mode == 3:
+            dfs = (f[:, :k] - f[:, k:]) / h / 2
+        elif f0 is not None:
+            dfs = (f - np.reshape(f0, (-1, 1))) / h
+        else:
+            dfs = (f[:, 1:] - f[:, :1]) / h
+
+        if sparsity is not None:
+            return scatter(dfs)
+
+        return dfs.reshape(*fshape, *x.shape)
 
-                jac[:, j] = (f - f0).ravel() / h / (mode - 1)
+    def jacwrapper(*args, f0=None, **kwargs):
+        """Calculates the jacobian as 2- or 3-point finite-differences
+        approximation w.r.t. a given argnum and h."""
+
+        # pre-evaluate f0 = f(x0) if 2-point scheme is used
+        if mode == 2 and f0 is None:
+            f0 = fun(*args, **kwargs)
+
+        # allow item assignment (convert tuple of args to list)
+        workargs = list(args)
+
+        # check if arg is an array
+        if isinstance(args[argnum], np.ndarray):
+            # loop over (single) columns
+            shape = np.shape(args[argnum])
+            groups = [[j] for j in range(np.size(args[argnum]))]
+            dfs, fshape = columns(args, kwargs, f0, groups)
 
             # reshape 2d-jacobian to desired shape
-            jac = jac.reshape(*f0.shape, *args[argnum].shape)
+            jac = np.column_stack(dfs).reshape(*fshape, *shape)
 
         else:  # arg is float
-            # allow item assignment (convert tuple of args to list)
-            fwdargs = list(copy.deepcopy(args))
-            fwdargs[argnum] = fwdargs[argnum] + h
-
-            f = fun(*fwdargs, **kwargs)
+            workargs[argnum] = args[argnum] + step
+            f = fun(*workargs, **kwargs)
 
             # re-define f0
             if mode == 3:
-                rvsargs = list(copy.deepcopy(args))
-                rvsargs[argnum] = rvsargs[argnum] - h
-                f0 = fun(*rvsargs, **kwargs)
+                workargs[argnum] = args[argnum] - h
+                f0 = fun(*workargs, **kwargs)
 
             # calculate jacobian
-            jac = (f - f0) / h / (mode - 1)
+            jac = difference(f, f0).reshape(np.shape(f))
 
         return jac
 
+    if vectorized:
+        return vectorizedwrapper
+
+    if sparsity is not None:
+        return sparsewrapper
+
     return jacwrapper
@@ -2,8 +2,12 @@
 contique: Numerical continuation of nonlinear equilibrium equations.
 """
 
+import inspect
+import warnings
+
 import numpy as np
-from scipy import sparse
+from scipy import linalg, sparse
+from scipy.sparse import linalg as splinalg
 
 from .helpers import argparser
 
@@ -56,12 +60,227 @@ class NewtonResult:
         self.niterations = 0
         self.x = x0.copy()
         self.fun = argparser(fun)(self.x, *args)
+        self.jac = None
 
         if jac is not None:
             self.jac = argparser(jac)(self.x, *args)
 
 
-def newtonrhapson(fun, x0, jac, args=(None,), maxiter=8, tol=1e-8, solve=None):
+def factorize(A, solve=None):
+    """Factorize a dense or sparse matrix and return a function which solves the
+    linear equation system for a given right-hand-side.
+
+    Parameters
+    ----------
+    A : ndarray or sparse matrix
+        the 2d-array or sparse matrix of the linear equation system
+    solve : callable, optional
+        a function which returns the solution of a linear equation system. If given,
+        no factorization is performed and this solver is used instead. A linear
+        solver with a ``setup(A)`` method (e.g. :class:`contique.ILUGMRES`) is set
+        up for the matrix instead.
+
+    Returns
+    -------
+    callable
+        a function ``b -> x`` which solves ``A x = b``
+    """
+
+    if hasattr(solve, "setup"):
+        # linear solver with separate setup and solve phases
+        return solve.setup(A)
+
+    if solve is not None:
+        return lambda b: solve(A, b)
+
+    if sparse.issparse(A):
+        return splinalg.splu(sparse.csc_matrix(A)).solve
+
+    # raise an error for singular matrices (like numpy.linalg.solve)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", linalg.LinAlgWarning)
+        lu = linalg.lu_factor(A, check_finite=False)
+
+    if np.any(np.diag(lu[0]) == 0):
+        raise np.linalg.LinAlgError("Singular matrix")
+
+    return lambda b: linalg.lu_solve(lu, b, check_finite=False)
+
+
+def directional(fun, x, f, args=(None,)):
+    """Return the jacobian of a function as a linear operator of finite-differences
+    directional derivatives (without forming the jacobian).
+
+    Parameters
+    ----------
+    fun : function
+        function in terms of unknows x and optional args which returns the
+        equilibrium equations.
+    x : ndarray
+        1d-array with the values of unknows x
+    f : ndarray
+        the equilibrium equations at x
+    args : tuple, optional
+        Optional tuple of arguments which are passed to the function (default is
+        (None,)).
+
+    Returns
+    -------
+    LinearOperator
+        the operator ``v -> (fun(x + h v) - fun(x)) / h``
+    """
+
+    eps = np.sqrt(np.finfo(float).eps)
+    f = np.ravel(f)
+
+    def matvec(v):
+        v = np.ravel(v)
+        vnorm = np.linalg.norm(v)
+
+        if vnorm == 0:
+            return np.zeros_like(f)
+
+        # step-width scaled by the norms of the unknowns and the direction
+        h = eps * (1 + np.linalg.norm(x)) / vnorm
+
+        return (np.ravel(argparser(fun)(x + h * v, *args)) - f) / h
+
+    return splinalg.LinearOperator((len(f), len(x)), matvec=matvec, dtype=float)
+
+
+def krylov(A, b, rtol, method="gmres", restart=30, M=None, maxiter=None, callback=None):
+    """Solve a linear equation system inexactly by a Krylov subspace method.
+
+    Parameters
+    ----------
+    A : LinearOperator, ndarray or sparse matrix
+        the linear operator of the linear equation system
+    b : ndarray
+        1d-array of the right-hand-side
+    rtol : float
+        relative tolerance of the residual (forcing term)
+    method : str, optional
+        the Krylov subspace method, ``"gmres"`` or ``"bicgstab"`` (default is
+        "gmres")
+    restart : int, optional
+        number of iterations between restarts of GMRES (default is 30)
+    M : LinearOperator, ndarray or sparse matrix, optional
+        a preconditioner which approximates the inverse of A (default is None)
+    maxiter : int or None, optional
+        max. number of Krylov iterations. If the tolerance is not reached (e.g.
+        because of the noise of finite-differences directional derivatives), the
+        last iterate is returned (default is None, which is ``10 * restart``)
+    callback : callable or None, optional
+        a function which is called after each Krylov iteration (default is None)
+
+    Returns
+    -------
+    ndarray
+        1d-array with the (inexact) solution
+    """
+
+    if not np.all(np.isfinite(b)):
+        raise np.linalg.LinAlgError("Right-hand-side is not finite.")
+
+    if maxiter is None:
+        maxiter = 10 * restart
+
+    if method == "gmres":
+        # the max. number of iterations of GMRES is given in restart cycles
+        maxiter = -(-maxiter // restart)
+        solver, options = splinalg.gmres, dict(restart=restart, M=M, maxiter=maxiter)
+
+        if callback is not None:
+            # call the callback after each (inner) iteration
+            options.update(callback=callback, callback_type="pr_norm")
+
+    elif method == "bicgstab":
+        options = dict(M=M, maxiter=maxiter, callback=callback)
+        solver = splinalg.bicgstab
+    else:
+        raise ValueError('Krylov method must be either "gmres" or "bicgstab".')
+
+    # the relative tolerance is named tol for SciPy < 1.12
+    if "rtol" in inspect.signature(solver).parameters:
+        options.update(rtol=rtol)
+    else:
+        options.update(tol=rtol)
+
+    x, info = solver(A, b, atol=0.0, **options)
+
+    if info < 0:
+        raise np.linalg.LinAlgError("Illegal input or breakdown.")
+
+    return x
+
+
+def backtrack(fun, x, dx, fnorm, args=(None,), maxbacktrack=10, c=1e-4):
+    """Backtracking line search along a Newton step. The step is halved until the
+    norm of the equilibrium equations is sufficiently decreased (Armijo condition).
+
+    Parameters
+    ----------
+    fun : function
+        function in terms of unknows x and optional args which returns the
+        equilibrium equations.
+    x : ndarray
+        1d-array with the current values of unknows x
+    dx : ndarray
+        1d-array with the Newton step
+    fnorm : float
+        the norm of the equilibrium equations at x
+    args : tuple, optional
+        Optional tuple of arguments which are passed to the function (default is
+        (None,)).
+    maxbacktrack : int, optional
+        max. number of halvings of the step (default is 10)
+    c : float, optional
+        the parameter of the sufficient decrease (default is 1e-4)
+
+    Returns
+    -------
+    dx : ndarray
+        1d-array with the (scaled) step
+    f : ndarray
+        the equilibrium equations at ``x + dx`` (the last evaluated trial)
+    decreased : bool
+        flag of the sufficient decrease. If False, the step is the last trial with
+        ``maxbacktrack`` halvings.
+    """
+
+    alpha = 1.0
+    decreased = False
+
+    for i in range(1 + maxbacktrack):
+        f = argparser(fun)(x + alpha * dx, *args)
+
+        # sufficient decrease of the norm of the equilibrium equations
+        if np.linalg.norm(f) <= (1 - c * alpha) * fnorm:
+            decreased = True
+            break
+
+        if i < maxbacktrack:
+            alpha /= 2
+
+    return alpha * dx, f, decreased
+
+
+def newtonrhapson(
+    fun,
+    x0,
+    jac,
+    args=(None,),
+    maxiter=8,
+    tol=1e-8,
+    solve=None,
+    method="newton",
+    refactor_every=None,
+    profiler=None,
+    maxbacktrack=10,
+    krylov_method="gmres",
+    restart=30,
+    preconditioner=None,
+):
     """A simple n-dimensional Newton-Rhapson solver.
 
     Parameters
@@ -81,6 +300,39 @@ def newtonrhapson(fun, x0, jac, args=(None,), maxiter=8, tol=1e-8, solve=None):
         maximum number of iterations (default is 8)
     tol : float, optional
         tolerated residual of the norm of the equilibrium equation (default is 1e-8)
+    solve : callable, optional
+        a function which returns the solution of a linear equation system or a
+        linear solver with separate setup and solve phases (see :func:`factorize`)
+    method : str, optional
+        Newton-Rhapson ("newton"), chord ("chord"), Newton-Rhapson with a
+        backtracking line search ("linesearch") or jacobian-free Newton-Krylov
+        ("jfnk") method (default is "newton").
+        The chord method (modified Newton-Rhapson) re-uses the factorized jacobian
+        for subsequent iterations. The jacobian is re-evaluated and re-factorized
+        only if the contraction rate of the norm of the equilibrium equations gets
+        worse or diverges. The line search halves the Newton step until the norm of
+        the equilibrium equations decreases sufficiently (Armijo condition) and the
+        iterations stop if no sufficient decrease is found. The jacobian-free Newton-Krylov method does not evaluate the jacobian. The
+        linear equations are solved inexactly by a Krylov subspace method with
+        finite-differences directional derivatives and Eisenstat-Walker forcing
+        terms.
+    refactor_every : int or None, optional
+        re-factorize the jacobian (at least) after a given number of iterations of
+        the chord method (default is None).
+    profiler : Profiler or None, optional
+        a profiler which counts and times the iterations (default is None).
+    maxbacktrack : int, optional
+        max. number of halvings of the Newton step of the line search (default is
+        10).
+    krylov_method : str, optional
+        the Krylov subspace method of the jacobian-free Newton-Krylov method,
+        ``"gmres"`` or ``"bicgstab"`` (default is "gmres").
+    restart : int, optional
+        number of iterations between restarts of GMRES (default is 30).
+    preconditioner : LinearOperator, sparse matrix, callable or None, optional
+        a preconditioner of the jacobian-free Newton-Krylov method which
+        approximates the inverse of the jacobian. A callable is evaluated once at
+        the initial unknowns as ``preconditioner(x0, *args)`` (default is None).
 
     Returns
     -------
@@ -89,32 +341,123 @@ def newtonrhapson(fun, x0, jac, args=(None,), maxiter=8, tol=1e-8, solve=None):
 
     """
 
+    if method not in ["newton", "chord", "linesearch", "jfnk"]:
+        raise ValueError(
+            'Method must be either "newton", "chord", "linesearch" or "jfnk".'
+        )
+
     # init result object with initial function evaluation
     res = NewtonResult(fun, x0, None, args)
 
+    # init the factorized jacobian and contraction rates of the chord method
+    lu = None
+    rates = []
+    fnorm = np.linalg.norm(res.fun)
+
+    # init all contraction rates of the iterations
+    res.rates = []
+
+    # init the forcing term and the preconditioner of the Newton-Krylov method
+    eta = 0.5
+    M = preconditioner
+    if method == "jfnk" and callable(M) and not isinstance(M, splinalg.LinearOperator):
+        M = M(res.x, *args)
+
+    # init the flag of a failed line search
+    stalled = False
+
     # iteration loop
     for res.niterations in range(1, 1 + maxiter):
-        # calculate jacobian at x
-        res.jac = argparser(jac)(res.x, *args)
-
-        # set solver according to dense or sparse jacobian
-        if solve is None:
-            if sparse.issparse(res.jac):
-                solve = sparse.linalg.spsolve
-            else:
-                solve = np.linalg.solve
-
-        # solve linear equation system
-        try:
-            res.x += solve(res.jac, -res.fun)
-        except:  # NOQA: E722
-            res.x *= np.nan
+        if profiler is not None:
+            start = profiler.start("iteration", iteration=res.niterations)
+
+        # function at the updated x (evaluated by the line search)
+        fun_x = None
+
+        if method in ["newton", "linesearch"]:
+            # calculate jacobian at x
+            res.jac = argparser(jac)(res.x, *args)
+
+            # set solver according to dense or sparse jacobian
+            if solve is None:
+                if sparse.issparse(res.jac):
+                    solve = sparse.linalg.spsolve
+                else:
+                    solve = np.linalg.solve
+
+            # solve linear equation system
+            try:
+                dx = solve(res.jac, -res.fun)
+            except:  # NOQA: E722
+                dx = res.x * np.nan
+
+            if method == "linesearch" and np.all(np.isfinite(dx)):
+                # backtracking line search on the norm of the equilibrium equations
+                dx, fun_x, decreased = backtrack(
+                    fun, res.x, dx, fnorm, args, maxbacktrack
+                )
+                stalled = not decreased
+
+            res.x += dx
+
+        elif method == "jfnk":
+            # Eisenstat-Walker forcing term (choice 2, safeguarded)
+            if len(res.rates) > 0:
+                eta, eta0 = 0.9 * res.rates[-1] ** 2, eta
+                if 0.9 * eta0**2 > 0.1:
+                    eta = max(eta, 0.9 * eta0**2)
+
+            # avoid over-solving close to the solution
+            if fnorm > 0:
+                eta = max(eta, 0.5 * tol / fnorm)
+
+            eta = min(eta, 0.9)
+
+            # inexact solution with finite-differences directional derivatives
+            try:
+                A = directional(fun, res.x, res.fun, args)
+                res.x += krylov(A, -np.ravel(res.fun), eta, krylov_method, restart, M)
+            except:  # NOQA: E722
+                res.x *= np.nan
+
+        else:  # chord method
+            # re-factorize if the contraction rate of the chord iterations gets
+            # worse, diverges or after a given number of iterations
+            worse = len(rates) > 2 and rates[-1] > rates[-2]
+            diverged = len(rates) > 0 and not rates[-1] < 1
+            renew = refactor_every is not None and len(rates) >= refactor_every
+
+            if lu is None or worse or diverged or renew:
+                res.jac = argparser(jac)(res.x, *args)
+                rates = []
+
+                try:
+                    lu = factorize(res.jac, solve)
+                except:  # NOQA: E722
+                    lu = None
+
+            # solve linear equation system with the factorized jacobian
+            try:
+                res.x += lu(-res.fun)
+            except:  # NOQA: E722
+                res.x *= np.nan
 
         # calculate function at updated x
-        res.fun = argparser(fun)(res.x, *args)
+        if fun_x is None:
+            res.fun = argparser(fun)(res.x, *args)
+        else:
+            res.fun = fun_x
+
+        if profiler is not None:
+            profiler.stop("iteration", start, iteration=res.niterations)
+
+        # contraction rate of the norm of the equilibrium equations
+        fnorm, fnorm0 = np.linalg.norm(res.fun), fnorm
+        rates.append(fnorm / fnorm0 if fnorm0 > 0 else 0.0)
+        res.rates.append(rates[-1])
 
         # convergence check
-        if np.linalg.norm(res.fun) < tol:
+        if fnorm < tol:
             res.success = True
             res.status = 1
             res.message = "Solution converged in {0:2d} Iteration".format(
@@ -125,6 +468,10 @@ def newtonrhapson(fun, x0, jac, args=(None,), maxiter=8, tol=1e-8, solve=None):
 
             break
 
+        # stop if the line search did not decrease the equilibrium equations
+        if stalled:
+            break
+
     # check if newton process failed
     if not res.success:
         if maxiter == 1:
@@ -134,6 +481,8 @@ def newtonrhapson(fun, x0, jac, args=(None,), maxiter=8, tol=1e-8, solve=None):
                     "because of input parameter `maxiter=1` (not converged).",
                 ]
             )
+        elif stalled:
+            res.message = "Newton-R. line search failed."
         else:
             res.message = "Newton-R. process failed."
 
@@ -4,13 +4,48 @@ contique: Numerical continuation of nonlinear equilibrium equations.
 
 import numpy as np
 from scipy import sparse
+from scipy.sparse import linalg as splinalg
 
 from .helpers import control, one_hot
 from .jacobian import jacobian
-from .newton import newtonrhapson
+from .newton import factorize, newtonrhapson
 
 
-def funxt(y, one_hot_vector, ymax, fun, jac=None, jacmode=3, jaceps=None, args=(None,)):
+def funy(y, fun, *args):
+    """Evaluate the given equilibrium equations in terms of the extended unknowns
+    ``y = [x, lpf]``. For a vectorized function, ``y`` may be of shape ``(n + 1, k)``.
+
+    Parameters
+    ----------
+    y : array
+        1d-array of unknowns
+    fun : function
+        1d-array of equilibrium equations
+    *args : tuple, optional
+        Optional arguments which are passed to the function.
+
+    Returns
+    -------
+    array
+        the equilibrium equations
+    """
+
+    return fun(y[:-1], y[-1], *args)
+
+
+def funxt(
+    y,
+    one_hot_vector,
+    ymax,
+    fun,
+    jac=None,
+    jacmode=3,
+    jaceps=None,
+    args=(None,),
+    vectorized=False,
+    cache=None,
+    bordered=False,
+):
     """Extend the given equilibrium equations.
 
     Parameters
@@ -23,16 +58,31 @@ def funxt(y, one_hot_vector, ymax, fun, jac=None, jacmode=3, jaceps=None, args=(
         1d-array with max. allowed values of unknows
     fun : function
         1d-array of equilibrium equations
-    jac : function, optional
-        jacobian of fun w.r.t. the extended unknows y
-    jacmode : int, optional
-        forward (2) or central (3) finite-differences approx. of the jacobian
+    jac : tuple of functions or function, optional
+        tuple of the jacobians of fun w.r.t. the unknowns x and the lpf or a
+        finite-differences jacobian (see :func:`contique.jacobian`) of :func:`funy`
+        w.r.t. the extended unknowns y
+    jacmode : int or str, optional
+        forward (2) or central (3) finite-differences or complex-step ("complex")
+        approx. of the jacobian
     jaceps : float, optional
-        user-specified stepwidth (if None, this defaults to eps^(1/mode))
+        user-specified stepwidth (if None, this defaults to eps^(1/mode) or 1e-20 for
+        the complex-step approx.)
     args : tuple, optional
         Optional tuple of arguments which are passed to the function. Even if
         only one argument is passed, it has to be encapsulated in a tuple
         (default is (None,)).
+    vectorized : bool, optional
+        flag to evaluate all finite-differences perturbations of the extended
+        unknowns by one call of a vectorized function (default is False)
+    cache : dict, optional
+        the cache of the base point ``cache["y0"]`` with the equilibrium equations
+        ``cache["f0"]`` and the jacobians ``cache["dfdy"]`` and ``cache["dgdy"]`` at
+        the base point along with the last evaluated equilibrium equations
+        ``cache["f"]`` at the extended unknowns ``cache["y"]`` (default is None).
+    bordered : bool, optional
+        flag to return the jacobian w.r.t. the extended unknowns without the
+        derivative of the control equation (default is False)
 
     Returns
     -------
@@ -41,21 +91,55 @@ def funxt(y, one_hot_vector, ymax, fun, jac=None, jacmode=3, jaceps=None, args=(
         with control equation
     """
 
-    # split the unknowns
-    x, lpf = y[:-1], y[-1]
+    # check if y is the base point of the cache
+    base = cache is not None and np.array_equal(cache.get("y0"), y)
 
-    # evaluate the given function
-    f = fun(x, lpf, *args)
+    if base and "f0" in cache:
+        # re-use the equilibrium equations at the base point
+        f = cache["f0"]
 
-    if sparse.issparse(f):
-        # convert function vector to array
-        f = f.toarray()
+    elif cache is not None and np.array_equal(cache.get("y"), y):
+        # re-use the last evaluated equilibrium equations
+        f = cache["f"]
+
+    else:
+        # split the unknowns
+        x, lpf = y[:-1], y[-1]
+
+        # evaluate the given function
+        f = fun(x, lpf, *args)
+
+        if sparse.issparse(f):
+            # convert function vector to array
+            f = f.toarray()
 
     # extend the function
-    return np.append(f, np.dot(one_hot_vector, (y - ymax)))
+    fxt = np.append(f, np.dot(one_hot_vector, (y - ymax)))
+
+    if cache is not None:
+        # store the equilibrium equations for the finite-differences jacobian
+        cache["y"] = y.copy()
+        cache["f"] = fxt[:-1]
+
+        if base:
+            cache["f0"] = cache["f"]
 
+    return fxt
 
-def jacxt(y, one_hot_vector, ymax, fun, jac=None, jacmode=3, jaceps=None, args=(None,)):
+
+def jacxt(
+    y,
+    one_hot_vector,
+    ymax,
+    fun,
+    jac=None,
+    jacmode=3,
+    jaceps=None,
+    args=(None,),
+    vectorized=False,
+    cache=None,
+    bordered=False,
+):
     """Jacobian of extended equilibrium equations.
 
     Parameters
@@ -69,60 +153,276 @@ def jacxt(y, one_hot_vector, ymax, fun, jac=None, jacmode=3, jaceps=None, args=(
     fun : function
         function in terms of unknows x and optional args which returns the
         equilibrium equations.
-    jac : function, optional
-        jacobian of fun w.r.t. the extended unknows y
-    jacmode : int, optional
-        forward (2) or central (3) finite-differences approx. of the jacobian
+    jac : tuple of functions or function, optional
+        tuple of the jacobians of fun w.r.t. the unknowns x and the lpf or a
+        finite-differences jacobian (see :func:`contique.jacobian`) of :func:`funy`
+        w.r.t. the extended unknowns y
+    jacmode : int or str, optional
+        forward (2) or central (3) finite-differences or complex-step ("complex")
+        approx. of the jacobian
     jaceps : float, optional
-        user-specified stepwidth (if None, this defaults to eps^(1/mode))
+        user-specified stepwidth (if None, this defaults to eps^(1/mode) or 1e-20 for
+        the complex-step approx.)
     args : tuple, optional
         Optional tuple of arguments which are passed to the function. Even if
         only one argument is passed, it has to be encapsulated in a tuple
         (default is (None,)).
+    vectorized : bool, optional
+        flag to evaluate all finite-differences perturbations of the extended
+        unknowns by one call of a vectorized function (default is False)
+    cache : dict, optional
+        the cache of the base point ``cache["y0"]`` with the equilibrium equations
+        ``cache["f0"]`` and the jacobians ``cache["dfdy"]`` and ``cache["dgdy"]`` at
+        the base point along with the last evaluated equilibrium equations
+        ``cache["f"]`` at the extended unknowns ``cache["y"]`` (default is None).
+    bordered : bool, optional
+        flag to return the jacobian w.r.t. the extended unknowns without the
+        derivative of the control equation (default is False)
 
     Returns
     -------
         ndarray
         jacobian of fun w.r.t. y (contains both derivatives of x and lpf)
-        as 2d-array
+        as 2d-array. If ``bordered=True``, the derivative of the control equation
+        is not included.
     """
 
-    # split the unknowns
-    x, lpf = y[:-1], y[-1]
+    # check if y is the base point of the cache
+    base = cache is not None and np.array_equal(cache.get("y0"), y)
+    component = np.argmax(one_hot_vector)
+
+    if base and bordered and "dfdy" in cache:
+        # re-use the jacobian at the base point
+        return cache["dfdy"]
+
+    if base and not bordered and component in cache.get("dgdy", {}):
+        # re-use the extended jacobian at the base point for the same control
+        return cache["dgdy"][component]
 
     if jac is None:
-        # evaluate by finite differences method
-        dfundx = jacobian(fun, argnum=0, mode=jacmode, h=jaceps)
-        dfundl = jacobian(fun, argnum=1, mode=jacmode, h=jaceps)
+        # finite differences method w.r.t. the extended unknowns y = [x, lpf]
+        jac = jacobian(funy, argnum=0, mode=jacmode, h=jaceps, vectorized=vectorized)
+
+    if base and "dfdy" in cache:
+        # re-use the jacobian at the base point
+        dfdy = cache["dfdy"]
+
+    elif callable(jac):
+        # re-use the equilibrium equations if they were evaluated at the same y
+        f0 = None
+        if cache is not None and np.array_equal(cache.get("y"), y):
+            f0 = cache["f"]
+
+        # evaluate the jacobian w.r.t. the extended unknowns in one sweep
+        dfdy = jac(y, fun, *args, f0=f0)
+
     else:
+        # split the unknowns
+        x, lpf = y[:-1], y[-1]
+
+        # evaluate the given jacobian
         dfundx, dfundl = jac
+        dfdx = dfundx(x, lpf, *args)
+        dfdl = dfundl(x, lpf, *args).reshape(-1, 1)
 
-    # evaluate the given jacobian
-    dfdx = dfundx(x, lpf, *args)
-    dfdl = dfundl(x, lpf, *args).reshape(-1, 1)
+        if sparse.issparse(dfdx):
+            dfdy = sparse.hstack([dfdx, sparse.csr_matrix(dfdl)], format="csc")
+        else:
+            dfdy = np.hstack([dfdx, dfdl])
 
-    # define horizontal and vertical stack operations based on evaluated
-    # sparse or dense jacobian
-    if sparse.issparse(dfdx):
-        hstack = sparse.hstack
-        vstack = sparse.vstack
-        array = sparse.csr_matrix
-    else:
-        hstack = np.hstack
-        vstack = np.vstack
-        array = np.array
+    if bordered:
+        if base:
+            # store the jacobian at the base point
+            cache["dfdy"] = dfdy
 
-    # extend the jacobian
-    dfdy = hstack([array(dfdx), array(dfdl)])
-    dgdy = vstack([dfdy, array(one_hot_vector)])
+        # the derivative of the control equation is handled by the solver
+        return dfdy
+
+    # extend the jacobian by the derivative of the control equation
+    if sparse.issparse(dfdy):
+        dgdy = sparse.vstack([dfdy, sparse.csr_matrix(one_hot_vector)])
 
-    if sparse.issparse(dfdx):
         # convert to compressed sparse row format
         dgdy = dgdy.tocsr()
 
+    else:
+        dgdy = np.vstack([dfdy, one_hot_vector])
+
+    if base:
+        # store the jacobians at the base point
+        cache["dfdy"] = dfdy
+        cache.setdefault("dgdy", {})[component] = dgdy
+
     return dgdy
 
 
+def solver(cache, one_hot_vector, solve=None, bordered=True):
+    """Return a linear solver for the extended equilibrium equations, which re-uses
+    the factorizations of the (cached) jacobians at the base point.
+
+    For the bordered solver, the given matrix is the jacobian w.r.t. the extended
+    unknowns without the one-hot row of the control equation. The control component
+    of the solution is fixed by the control equation and the remaining components
+    are obtained by the factorized jacobian without the column of the control
+    component. The extended matrix is never assembled.
+
+    Parameters
+    ----------
+    cache : dict
+        the cache of the base point (see :func:`jacxt`)
+    one_hot_vector : ndarray
+        1d-array with pre-evaluated one-hot vector
+    solve : callable, optional
+        a function which returns the solution of a linear equation system or a
+        linear solver with separate setup and solve phases (see
+        :class:`contique.ILUGMRES`)
+    bordered : bool, optional
+        flag for the bordered solver (default is True). If False, the given matrix
+        is the extended jacobian (with the derivative of the control equation).
+
+    Returns
+    -------
+    callable
+        a function ``A, b -> x`` which solves ``A x = b``
+    """
+
+    component = np.argmax(one_hot_vector)
+    mask = one_hot_vector == 0
+
+    def factorization(A):
+        """Return the factorized (reduced) jacobian along with the column of the
+        control component."""
+
+        if not bordered:
+            return factorize(A, solve), None
+
+        if sparse.issparse(A):
+            A = sparse.csc_matrix(A)
+            column = A[:, [component]].toarray().ravel()
+        else:
+            column = A[:, component]
+
+        return factorize(A[:, mask], solve), column
+
+    def linsolve(A, b):
+        "Solve the linear equation system with re-used factorizations."
+
+        # factorized jacobians at the base point (per control component)
+        factorized = cache.setdefault("factorized", {})
+
+        if A is cache.get("dfdy") or A is cache.get("dgdy", {}).get(component):
+            if component not in factorized:
+                factorized[component] = factorization(A)
+
+            lu, column = factorized[component]
+
+        else:
+            # last factorized jacobian (re-used by the chord method)
+            if cache.get("A") is not A:
+                factorized_A = factorization(A)
+                cache["A"], cache["factorized_A"] = A, factorized_A
+
+            lu, column = cache["factorized_A"]
+
+        if not bordered:
+            return lu(b)
+
+        # fixed control component and remaining components of the solution
+        x = np.empty(len(b))
+        x[component] = b[-1]
+        x[mask] = lu(b[:-1] - column * b[-1])
+
+        return x
+
+    return linsolve
+
+
+def ilu(y0, xtargs, jac=jacxt, drop_tol=1e-4, fill_factor=10):
+    """Return an incomplete LU factorization of the (cached) extended jacobian at the
+    base point as preconditioner of the jacobian-free Newton-Krylov method.
+
+    Parameters
+    ----------
+    y0 : ndarray
+        1d-array of the extended unknowns at the base point
+    xtargs : tuple
+        the arguments of :func:`funxt` and :func:`jacxt`
+    jac : function, optional
+        the extended jacobian, e.g. :func:`jacxt` timed by a profiler (default is
+        :func:`jacxt`)
+    drop_tol : float, optional
+        drop tolerance of the incomplete LU factorization (default is 1e-4)
+    fill_factor : float, optional
+        max. fill ratio of the incomplete LU factorization (default is 10)
+
+    Returns
+    -------
+    LinearOperator or None
+        the preconditioner (None if the factorization fails)
+
+    Raises
+    ------
+    ValueError
+        If the extended jacobian is not a sparse matrix.
+    """
+
+    cache = xtargs[-2]
+    component = np.argmax(xtargs[0])
+    preconditioners = cache.setdefault("ilu", {})
+
+    if component not in preconditioners:
+        # the extended jacobian with the derivative of the control equation
+        dgdy = jac(y0, *xtargs[:-1], False)
+
+        if not sparse.issparse(dgdy):
+            raise ValueError(
+                'The "ilu" preconditioner requires a sparse jacobian, e.g. by a '
+                "sparsity pattern of the finite-differences jacobian."
+            )
+
+        dgdy = sparse.csc_matrix(dgdy)
+
+        try:
+            factorized = splinalg.spilu(
+                dgdy, drop_tol=drop_tol, fill_factor=fill_factor
+            )
+            preconditioners[component] = splinalg.LinearOperator(
+                dgdy.shape, factorized.solve
+            )
+        except RuntimeError:
+            preconditioners[component] = None
+
+    return preconditioners[component]
+
+
+def predict(y0, predictor):
+    """Predict the initial extended unknowns for the Newton-Rhapson iterations.
+
+    Parameters
+    ----------
+    y0 : ndarray
+        1d-array of initial extended unknows
+    predictor : ndarray or None
+        a 1d-array with the predicted extended unknowns (or None)
+
+    Returns
+    -------
+    ndarray
+        1d-array of the predicted extended unknowns (``y0`` if no finite predictor
+        is given)
+    """
+
+    if predictor is None:
+        return y0
+
+    predictor = np.asarray(predictor, dtype=float)
+
+    if np.all(np.isfinite(predictor)):
+        return predictor
+
+    return y0
+
+
 def newtonxt(
     fun,
     jac,
@@ -135,6 +435,16 @@ def newtonxt(
     maxiter=20,
     tol=1e-8,
     solve=None,
+    vectorized=False,
+    newton="newton",
+    refactor_every=None,
+    cache=None,
+    bordered=True,
+    predictor=None,
+    profiler=None,
+    krylov="gmres",
+    restart=30,
+    preconditioner=None,
 ):
     """Solve equilibrium equations starting from an initial solution
     with a given control component and a max. allowed increase of unknowns.
@@ -144,18 +454,22 @@ def newtonxt(
     fun : function
         function in terms of extended unknows and optional args which returns
         the extended equilibrium equations
-    jac : function, optional
-        jacobian of fun w.r.t. the extended unknows
+    jac : tuple of functions or function, optional
+        tuple of the jacobians of fun w.r.t. the unknowns x and the lpf or a
+        finite-differences jacobian (see :func:`contique.jacobian`) of :func:`funy`
+        w.r.t. the extended unknowns y
     y0 : ndarray
         1d-array of initial extended unknows
     control0 : tuple of int, optional
         initial tuple of control component and sign
     dxmax : float, optional
         max. allowed absolute incremental increase of extended unknowns per step
-    jacmode : int, optional
-        forward (2) or central (3) finite-differences approx. of the jacobian
+    jacmode : int or str, optional
+        forward (2) or central (3) finite-differences or complex-step ("complex")
+        approx. of the jacobian
     jaceps : float, optional
-        user-specified stepwidth (if None, this defaults to eps^(1/mode))
+        user-specified stepwidth (if None, this defaults to eps^(1/mode) or 1e-20 for
+        the complex-step approx.)
     args : tuple, optional
         Optional tuple of arguments which are passed to the function. Eeven if only
         one argument is passed, it has to be encapsulated in a tuple (default is
@@ -166,6 +480,48 @@ def newtonxt(
         tolerated residual of the norm of the equilibrium equation (default is 1e-8)
     solve: callable, optional
         A solver.
+    vectorized : bool, optional
+        flag to evaluate all finite-differences perturbations of the extended
+        unknowns by one call of a vectorized function (default is False)
+    newton : str, optional
+        Newton-Rhapson ("newton"), chord ("chord"), Newton-Rhapson with a
+        backtracking line search ("linesearch") or jacobian-free Newton-Krylov
+        ("jfnk") method (default is "newton"). The chord method re-uses the
+        factorized jacobian for subsequent iterations and re-factorizes only if the
+        contraction rate gets worse (see :func:`contique.newton.newtonrhapson`).
+    refactor_every : int or None, optional
+        re-factorize the jacobian (at least) after a given number of iterations of
+        the chord method (default is None)
+    cache : dict, optional
+        the cache of the base point (see :func:`jacxt`), which is shared by all calls
+        with the same initial extended unknowns. It is cleared if the base point
+        changes (default is None).
+    bordered : bool, optional
+        flag to solve the extended equilibrium equations by the bordered solver
+        with a fixed control component, which does not assemble the extended
+        jacobian (default is True). If False, the linear equations are solved with
+        the stacked extended jacobian.
+    predictor : ndarray or None, optional
+        predictor of the initial extended unknowns for the Newton-Rhapson iterations.
+        If None, the iterations start from ``y0`` and the first iteration is the
+        tangent at ``y0``, scaled to the max. allowed increase of the control
+        component. If a 1d-array is given, the iterations start from these
+        predicted extended unknowns (default is None).
+    profiler : Profiler or None, optional
+        a profiler which counts and times the evaluations of the extended jacobian,
+        the linear solutions and the iterations (default is None).
+    krylov : str, optional
+        the Krylov subspace method of the jacobian-free Newton-Krylov method,
+        ``"gmres"`` or ``"bicgstab"`` (default is "gmres").
+    restart : int, optional
+        number of iterations between restarts of GMRES (default is 30).
+    preconditioner : str, LinearOperator, callable or None, optional
+        a preconditioner of the jacobian-free Newton-Krylov method. A callable is
+        evaluated as ``preconditioner(y0, *args)``. With ``"ilu"``, an incomplete
+        LU factorization of the extended jacobian at the base point is re-used for
+        all iterations with the same control component, which requires a sparse
+        jacobian. The preconditioner is only evaluated by the jacobian-free
+        Newton-Krylov method with ``maxiter > 0`` (default is None).
 
     Returns
     -------
@@ -178,17 +534,74 @@ def newtonxt(
     one_hot_vector = one_hot(component0, len(y0))
     ymax = y0 + sign0 * dymax
 
+    # init the cache of the equilibrium equations, the jacobians and their
+    # factorizations at the base point y0
+    if cache is None:
+        cache = {}
+
+    if not np.array_equal(cache.get("y0"), y0):
+        cache.clear()
+        cache["y0"] = y0.copy()
+
+    xtargs = (
+        one_hot_vector,
+        ymax,
+        fun,
+        jac,
+        jacmode,
+        jaceps,
+        args,
+        vectorized,
+        cache,
+        bordered,
+    )
+    linsolve = solver(cache, one_hot_vector, solve, bordered)
+    jacobianxt = jacxt
+
+    if profiler is not None:
+        linsolve = profiler.timed("linsolve", linsolve)
+        jacobianxt = profiler.timed("jacxt", jacxt)
+
+    if newton != "jfnk" or maxiter < 1:
+        # the preconditioner is not used
+        preconditioner = None
+
+    elif isinstance(preconditioner, str):
+        if preconditioner != "ilu":
+            raise ValueError('Preconditioner must be either "ilu" or not a string.')
+
+        # incomplete LU factorization of the extended jacobian at the base point
+        preconditioner = ilu(y0, xtargs, jacobianxt)
+
+    elif callable(preconditioner) and not isinstance(
+        preconditioner, splinalg.LinearOperator
+    ):
+        # user-defined preconditioner at the base point
+        preconditioner = preconditioner(y0, *args)
+
+    # initial extended unknowns of the Newton-Rhapson iterations
+    ypred = predict(y0, predictor)
+
     # Newton-Rhapson solver
     res = newtonrhapson(
         fun=funxt,
-        x0=y0,
-        jac=jacxt,
-        args=(one_hot_vector, ymax, fun, jac, jacmode, jaceps, args),
+        x0=ypred,
+        jac=jacobianxt,
+        args=xtargs,
         maxiter=maxiter,
         tol=tol,
-        solve=solve,
+        solve=linsolve,
+        method=newton,
+        refactor_every=refactor_every,
+        profiler=profiler,
+        krylov_method=krylov,
+        restart=restart,
+        preconditioner=preconditioner,
     )
 
+    # predicted (initial) extended unknowns
+    res.ypred = ypred
+
     # normalized dy = dy/dymax
     res.dys = (res.x - y0) / dymax
 
@@ -3,10 +3,14 @@ contique: Numerical continuation of nonlinear equilibrium equations
 """
 
 import numpy as np
+from scipy import sparse
 
 from . import printinfo
 from .helpers import argparser2
-from .newtonxt import newtonxt
+from .io import load_checkpoint, save_checkpoint
+from .jacobian import jacobian, sparsity
+from .newtonxt import funy, newtonxt
+from .profiler import Profiler
 
 
 def solve(
@@ -20,18 +24,36 @@ def solve(
     control0=(-1, 1),
     jacmode=3,
     jaceps=None,
+    jacsparsity=None,
+    vectorized=False,
+    jac_workers=None,
     maxsteps=50,
     maxcycles=4,
     maxiter=8,
     tol=1e-6,
     overshoot=1.0,
     rebalance=False,
+    target=4,
     increase=0.5,
     decrease=2.0,
     high=10,
     low=1e-6,
     minlastfailed=3,
     solve=None,
+    newton="newton",
+    refactor_every=None,
+    krylov="gmres",
+    restart=30,
+    preconditioner=None,
+    bordered=True,
+    predictor=None,
+    keepjac=False,
+    writer=None,
+    checkpoint=None,
+    checkpoint_every=10,
+    resume_from=None,
+    reporter="table",
+    profile=False,
     callback=lambda step, res: None,
 ):
     """Numeric continuation of (nonlinear) equilibrium equations.
@@ -57,10 +79,26 @@ def solve(
         max. allowed absolute incremental increase of lpf per step
     control0 : int, optional
         initial signed control component ( 1-indexed )
-    jacmode : int, optional
-        forward (2) or central (3) finite-differences approx. of the jacobian
+    jacmode : int or str, optional
+        forward (2) or central (3) finite-differences or complex-step ("complex")
+        approx. of the jacobian
     jaceps : float, optional
-        user-specified stepwidth (if None, this defaults to eps^(1/mode))
+        user-specified stepwidth (if None, this defaults to eps^(1/mode) or 1e-20 for
+        the complex-step approx.)
+    jacsparsity : ndarray, sparse matrix or str, optional
+        sparsity pattern of the jacobian of fun w.r.t. the unknowns x. If given (and
+        no jacobian is passed), a sparse jacobian is approximated by finite-differences
+        of grouped (colored) columns. With ``"auto"``, the pattern is detected once at
+        the initial solution (default is None).
+    vectorized : bool, optional
+        flag to evaluate all finite-differences perturbations of the jacobian by one
+        function call. If True, fun must accept x of shape ``(n, k)`` along with lpf
+        of shape ``(k,)`` and return the equilibrium equations of shape ``(n, k)``
+        (default is False).
+    jac_workers : int or None, optional
+        number of threads which evaluate the perturbed columns (or column groups) of
+        the finite-differences jacobian concurrently. The function must be
+        thread-safe and should release the GIL (default is None).
     maxsteps : int, optional
         max. number of steps
     maxcycles : int, optional
@@ -71,8 +109,16 @@ def solve(
         tolerated residual of the norm of the equilibrium equation (default is 1e-8)
     overshoot : float, optional
         allowed overshoot of the final control component of a cycle (default is 1.0)
-    rebalance : bool, optional
-        rebalance max. allowed incremental increase values after each step
+    rebalance : bool or str, optional
+        rebalance max. allowed incremental increase values after each step. If
+        True, the experimental uniform rebalance based on the number of iterations
+        is used (see :func:`adjust`). With ``"adaptive"``, the step-width is
+        controlled by the contraction rate of the Newton-iterations, the distance
+        of the predicted and the corrected solution, the curvature of the path and
+        the number of iterations (see :func:`adapt`, default is False).
+    target : int, optional
+        target number of Newton-iterations per step of the adaptive step-width
+        (default is 4)
     increase : float, optional
         rebalance increase factor
     decrease : float, optional
@@ -84,14 +130,93 @@ def solve(
     minlastfailed : int, optional
         rebalance increase only after a given number of converged steps
     solve : callable, optional
-        a function which returns the solution of a linear equation system
+        a function which returns the solution of a linear equation system or a
+        linear solver with separate setup and solve phases, like
+        :class:`contique.ILUGMRES`. Its method ``setup(A)`` returns a function
+        ``b -> x`` and it may re-use a preconditioner for the jacobians of all
+        iterations and steps.
+    newton : str, optional
+        Newton-Rhapson ("newton"), chord ("chord"), Newton-Rhapson with a
+        backtracking line search ("linesearch") or jacobian-free Newton-Krylov
+        ("jfnk") method (default is "newton"). The chord method re-uses the
+        factorized jacobian for subsequent iterations and re-factorizes only if the
+        contraction rate gets worse. The line search halves the Newton steps until
+        the norm of the extended equilibrium equations decreases sufficiently. The
+        jacobian-free Newton-Krylov method solves the linear equations inexactly by
+        a Krylov subspace method with finite-differences directional derivatives of
+        the extended equilibrium equations. Without a preconditioner, it never
+        assembles the jacobian, which requires memory of ``O(n restart)``.
+    refactor_every : int or None, optional
+        re-factorize the jacobian (at least) after a given number of iterations of
+        the chord method (default is None)
+    krylov : str, optional
+        the Krylov subspace method of the jacobian-free Newton-Krylov method,
+        ``"gmres"`` or ``"bicgstab"`` (default is "gmres")
+    restart : int, optional
+        number of iterations between restarts of GMRES (default is 30)
+    preconditioner : str, LinearOperator, callable or None, optional
+        a preconditioner of the jacobian-free Newton-Krylov method, which
+        approximates the inverse of the extended jacobian. A callable is evaluated
+        once per cycle as ``preconditioner(y0, *args)`` with the extended unknowns
+        ``y0`` of the last solution. With ``"ilu"``, an incomplete LU factorization
+        of the extended jacobian at the last solution is re-used for all cycles
+        with the same control component, which requires a sparse jacobian (a
+        sparsity pattern or a given sparse jacobian). The preconditioner is only
+        evaluated by the jacobian-free Newton-Krylov method (default is None)
+    bordered : bool, optional
+        flag to solve the extended equilibrium equations by the bordered solver
+        with a fixed control component, which does not assemble the extended
+        jacobian (default is True)
+    predictor : str or None, optional
+        predictor of the initial unknowns of the pre-identification of the control
+        component per step. If None, the pre-identification starts from the last
+        solution and its linear solution is the tangent of the (cached) jacobian.
+        With ``"secant"``, it starts from the secant of the last two solutions
+        (default is None). The first cycle always continues from the linear
+        solution of the pre-identification and re-cycles are warm-started from the
+        solution of the last cycle, projected to the new control component.
+    keepjac : bool, optional
+        flag to keep the (last evaluated) jacobians on the results (default is
+        False)
+    writer : object, optional
+        a sink with an ``append(res)`` method to which the results of the steps are
+        written, e.g. :class:`contique.io.MemmapWriter` to stream the path to disk in
+        chunks or :class:`contique.ContinuationPath`. An optional ``flush()`` method
+        is called at the end of the continuation (default is None).
+    checkpoint : str, optional
+        a file to which the state of the continuation is saved every
+        ``checkpoint_every`` steps (default is None).
+    checkpoint_every : int, optional
+        number of steps between two checkpoints (default is 10)
+    resume_from : str, optional
+        a checkpoint file from which the continuation is resumed. The initial
+        solution is not yielded again and the resumed run reproduces the results of
+        the uninterrupted run after the step of the checkpoint (default is None).
+        The state of a stateful linear solver, e.g. the re-used preconditioner of
+        :class:`contique.ILUGMRES`, is not checkpointed and the results of a
+        resumed run with such a solver may differ slightly. A given writer is not
+        resumed, i.e. :class:`contique.io.MemmapWriter` overwrites the states of
+        the interrupted run in its directory (use a new directory instead).
+    reporter : None, str, logging.Logger or callable, optional
+        the reporter of the cycles. None is silent (without any formatting),
+        ``"table"`` prints a formatted table, a logger logs the cycles and a
+        callable is called with a dict of a structured record per cycle (default is
+        "table").
+    profile : bool or Profiler, optional
+        flag to count and time the phases of the continuation (residuals,
+        jacobians, assembly, linear solutions, iterations, cycles and steps). The
+        stats since the last result and of the whole run are attached to the
+        results as ``res.stats`` and ``res.stats_total``. A given profiler is used
+        to collect the stats, e.g. :class:`contique.Tracer` to record a timeline of
+        the phases. If False, nothing is wrapped or timed (default is False).
     callback : callable, optional
         a function to interact with the results of each step
 
     Returns
     -------
-    Res : list
-        List of NewtonResults (with res.x being the final unknowns per step)
+    Res : generator
+        Generator of NewtonResults (with res.x being the final unknowns per step),
+        which may be collected by :class:`contique.ContinuationPath`.
 
     Examples
     --------
@@ -136,11 +261,72 @@ def solve(
 
     >>> x = np.array([r.x for r in res])
 
+    Alternatively, the results may be stored in a compact path.
+
+    >>> path = contique.ContinuationPath(res)
+    >>> x = path.y
+
     """
 
+    if rebalance not in [False, True, "adaptive"]:
+        raise ValueError('Rebalance must be either False, True or "adaptive".')
+
+    if predictor not in [None, "secant"]:
+        raise ValueError('Predictor must be either None or "secant".')
+
+    # the incomplete LU factorization requires a sparse jacobian
+    ilu = isinstance(preconditioner, str) and preconditioner == "ilu"
+    if newton == "jfnk" and ilu and jac is None and jacsparsity is None:
+        raise ValueError(
+            'The "ilu" preconditioner requires a sparse jacobian, e.g. by a '
+            "sparsity pattern of the jacobian (see jacsparsity)."
+        )
+
+    # init the reporter of the cycles
+    report = printinfo.reporter(reporter)
+
     # allow passing empty *args to fun(x, lpf)
     fun = argparser2(fun)
 
+    # detect the sparsity pattern of the jacobian once at the initial solution
+    # (probed at lpf0 and lpf0 + dlpfmax to catch lpf-scaled entries)
+    if jac is None and isinstance(jacsparsity, str) and jacsparsity == "auto":
+        detect = sparsity(fun, argnum=0)
+        jacsparsity = detect(x0, lpf0, *args) + detect(x0, lpf0 + dlpfmax, *args)
+
+    # init the finite-differences jacobian w.r.t. the extended unknowns y = [x, lpf]
+    # once for the whole run (the lpf-column is dense in the sparsity pattern)
+    if jac is None:
+        if jacsparsity is not None:
+            jacsparsity = sparse.hstack(
+                [
+                    sparse.csr_matrix(jacsparsity, dtype=bool),
+                    np.ones((len(x0), 1), dtype=bool),
+                ],
+                format="csr",
+            )
+
+        jac = jacobian(
+            funy,
+            argnum=0,
+            h=jaceps,
+            mode=jacmode,
+            sparsity=jacsparsity,
+            vectorized=vectorized,
+            workers=jac_workers,
+        )
+
+    # init the profiler (the functions are only wrapped if profiling is enabled)
+    profiler = None
+    if profile:
+        profiler = Profiler() if profile is True else profile
+        fun = profiler.timed("residual", fun)
+
+        if callable(jac):
+            jac = profiler.timed("fd_jacobian", jac)
+        else:
+            jac = tuple(profiler.timed("jacobian", j) for j in jac)
+
     # init extended number of unknowns
     ncomp = 1 + len(x0)
 
@@ -159,6 +345,26 @@ def solve(
     dymax = np.append(np.ones_like(x0) * dxmax, dlpfmax)
     dymax0 = dymax.copy()
 
+    # init the cache of the jacobian and its factorizations at the base point, which
+    # is shared by the pre-identification, the cycles and the retried steps
+    cache = {}
+
+    # init the previous solutions (used by the secant predictor and the curvature of
+    # the adaptive step-width)
+    y1 = y2 = None
+
+    # init the first step
+    step0 = 0
+
+    if resume_from is not None:
+        # restore the state of the continuation
+        state = load_checkpoint(resume_from)
+        step0 = state["step"]
+        y0, y1, y2 = state["y0"], state["y1"], state["y2"]
+        control0 = state["control0"]
+        dymax, dymax0 = state["dymax"], state["dymax0"]
+        lastfailed = state["lastfailed"]
+
     # init list of results
     res = newtonxt(
         fun,
@@ -172,13 +378,38 @@ def solve(
         maxiter=0,
         tol=tol,
         solve=solve,
+        vectorized=vectorized,
+        newton=newton,
+        refactor_every=refactor_every,
+        krylov=krylov,
+        restart=restart,
+        preconditioner=preconditioner,
+        cache=cache,
+        bordered=bordered,
+        profiler=profiler,
     )
-    yield res
+    if profiler is not None:
+        res.stats = res.stats_total = stats = profiler.snapshot()
+    if not keepjac:
+        res.jac = None
+    if writer is not None and resume_from is None:
+        writer.append(res)
+    if resume_from is None:
+        yield res
 
-    printinfo.header()
+    report.header()
 
     # Step loop.
-    for step in 1 + np.arange(maxsteps):
+    for step in 1 + np.arange(step0, maxsteps):
+        if profiler is not None:
+            start_step = profiler.start("step", step=step)
+
+        # predictor of the pre-identification (the secant of the last two solutions
+        # or the base point, from which the first iteration is the tangent)
+        ypredictor = None
+        if predictor == "secant" and y1 is not None:
+            ypredictor = extrapolate(y0, y0 - y1, control0, dymax)
+
         # pre-identification of control component
         res = newtonxt(
             fun,
@@ -192,10 +423,32 @@ def solve(
             maxiter=1,
             tol=tol,
             solve=solve,
+            vectorized=vectorized,
+            newton=newton,
+            refactor_every=refactor_every,
+            krylov=krylov,
+            restart=restart,
+            preconditioner=preconditioner,
+            cache=cache,
+            bordered=bordered,
+            predictor=ypredictor,
+            profiler=profiler,
         )
 
+        # first contraction rate of the Newton-iterations from the predictor (the
+        # pre-identification from the base point is the tangent predictor)
+        rate = None
+        if ypredictor is not None and len(res.rates) > 0:
+            rate = res.rates[0]
+
+        # continue the first cycle from the pre-identification iterate
+        ypredictor = res.x
+
         # Cycle loop.
         for cycl in 1 + np.arange(maxcycles):
+            if profiler is not None:
+                start_cycle = profiler.start("cycle", step=step, cycle=cycl)
+
             # Newton Iterations.
             res = newtonxt(
                 fun,
@@ -209,17 +462,24 @@ def solve(
                 maxiter=maxiter,
                 tol=tol,
                 solve=solve,
+                vectorized=vectorized,
+                newton=newton,
+                refactor_every=refactor_every,
+                krylov=krylov,
+                restart=restart,
+                preconditioner=preconditioner,
+                cache=cache,
+                bordered=bordered,
+                predictor=ypredictor,
+                profiler=profiler,
             )
-            printinfo.cycle(
-                step,
-                cycl,
-                control0,
-                res.control,
-                res.status,
-                np.linalg.norm(res.fun),
-                res.niterations,
-                max(abs(res.dys)) <= overshoot,
-            )
+            report.cycle(step, cycl, control0, res, overshoot)
+
+            if rate is None and len(res.rates) > 0:
+                rate = res.rates[0]
+
+            if profiler is not None:
+                profiler.stop("cycle", start_cycle, step=step, cycle=cycl)
 
             # Did Newton Iterations converge?
             if res.success:
@@ -228,26 +488,61 @@ def solve(
                 if np.allclose(control0, res.control) or max(abs(res.dys)) <= overshoot:
                     # Save results, move to next step.
                     control0 = res.control
-                    y0 = res.x
+                    y0, y1, y2 = res.x, y0, y1
+                    cache.clear()
+
+                    if profiler is not None:
+                        # stats since the last result and of the whole run
+                        profiler.stop("step", start_step, step=step)
+                        res.stats_total = profiler.snapshot()
+                        res.stats, stats = res.stats_total - stats, res.stats_total
 
                     callback(step, res)
+
+                    if not keepjac:
+                        res.jac = None
+
+                    if writer is not None:
+                        writer.append(res)
+
                     yield res
                     break
 
                 else:  # Were max. number of cycles reached?
                     if cycl == maxcycles:
                         # Print Error and set success-flag to False.
-                        printinfo.errorcontrol()
+                        report.errorcontrol()
                         res.success = False
                     else:
-                        # re-cycle Step with new control component
+                        # re-cycle Step with new control component, warm-started
+                        # from the last solution projected to the new control
                         control0 = res.control
+                        ypredictor = extrapolate(y0, res.x - y0, control0, dymax)
+
+                        if profiler is not None:
+                            profiler.count("recycle")
             else:
                 # break cycle loop if Newton Iterations failed.
                 break
 
         # Rebalance max. incremental unknowns
-        if rebalance:
+        if rebalance == "adaptive":
+            dymax, rebalanced, lastfailed = adapt(
+                dymax0,
+                dymax.copy(),
+                success=res.success,
+                n=res.niterations,
+                lastfailed=lastfailed,
+                **indicators(res, y0, y1, y2, dymax0, rate),
+                target=target,
+                increase=increase,
+                decrease=decrease,
+                high=high,
+                low=low,
+                minlastfailed=minlastfailed,
+            )
+
+        elif rebalance:
             dymaxn = dymax.copy()
             dymax, rebalanced, lastfailed = adjust(
                 dymax0,
@@ -263,14 +558,58 @@ def solve(
                 nref=8,
             )
 
+        if profiler is not None and not res.success:
+            # failed step
+            profiler.stop("step", start_step, step=step)
+
         # break step loop if Newton Iterations failed.
         if not res.success and not rebalanced:
-            printinfo.errorfinal()
+            report.errorfinal()
             break
 
+        # save the state of the continuation after the step
+        if checkpoint is not None and step % checkpoint_every == 0:
+            save_checkpoint(
+                checkpoint, step, y0, y1, y2, control0, dymax, dymax0, lastfailed
+            )
+
+    # write the buffered results of the writer
+    if writer is not None and hasattr(writer, "flush"):
+        writer.flush()
+
     return
 
 
+def extrapolate(y0, dy, control, dymax):
+    """Extrapolate the extended unknowns along a given increment, scaled to the max.
+    allowed increase of the signed control component.
+
+    Parameters
+    ----------
+    y0 : ndarray
+        1d-array of initial extended unknows
+    dy : ndarray
+        1d-array with the increment of the extended unknowns
+    control : tuple of int
+        tuple of control component and sign
+    dymax : ndarray
+        1d-array with the max. allowed increase of the extended unknowns
+
+    Returns
+    -------
+    ndarray or None
+        1d-array of extrapolated extended unknowns (None if the control component of
+        the increment is zero or not finite).
+    """
+
+    component, sign = control
+
+    if not np.all(np.isfinite(dy)) or not dy[component] != 0:
+        return None
+
+    return y0 + dy * sign * dymax[component] / dy[component]
+
+
 def adjust(
     x0,
     xn,
@@ -303,3 +642,170 @@ def adjust(
         rebalanced = False
 
     return y, rebalanced, lastfailed
+
+
+def indicators(res, y0, y1, y2, dymax0, rate=None):
+    """Evaluate the error indicators of an accepted step for the adaptive
+    step-width.
+
+    Parameters
+    ----------
+    res : NewtonResult
+        the result of the last cycle of the step
+    y0 : ndarray
+        1d-array of the extended unknowns of the step
+    y1 : ndarray or None
+        1d-array of the previous extended unknowns
+    y2 : ndarray or None
+        1d-array of the extended unknowns before the previous ones
+    dymax0 : ndarray
+        1d-array with the initial max. allowed increase of the extended unknowns
+    rate : float or None, optional
+        the first contraction rate of the Newton-iterations of the step, which start
+        from the predictor. If None, the first contraction rate of the last cycle
+        is used (default is None).
+
+    Returns
+    -------
+    dict
+        The first contraction rate ``theta`` of the Newton-iterations, the distance
+        ``delta`` of the predicted and the corrected solution relative to the step
+        and the angle ``alpha`` between the last two (normalized) secants of the
+        path (None if not available).
+    """
+
+    theta = delta = alpha = None
+
+    if not res.success:
+        return dict(theta=theta, delta=delta, alpha=alpha)
+
+    # first contraction rate of the Newton-iterations
+    if rate is not None:
+        theta = rate
+    elif len(getattr(res, "rates", [])) > 0 and res.niterations > 1:
+        theta = res.rates[0]
+
+    # distance of the predicted and the corrected solution relative to the step
+    if y1 is not None and getattr(res, "ypred", None) is not None:
+        step = np.linalg.norm((y0 - y1) / dymax0)
+        if step > 0:
+            delta = np.linalg.norm((y0 - res.ypred) / dymax0) / step
+
+    # angle between the last two secants (curvature times arc-length)
+    if y1 is not None and y2 is not None:
+        a = (y0 - y1) / dymax0
+        b = (y1 - y2) / dymax0
+        norms = np.linalg.norm(a) * np.linalg.norm(b)
+        if norms > 0:
+            alpha = np.arccos(np.clip(np.dot(a, b) / norms, -1, 1))
+
+    return dict(theta=theta, delta=delta, alpha=alpha)
+
+
+def adapt(
+    x0,
+    xn,
+    success,
+    n,
+    lastfailed,
+    theta=None,
+    delta=None,
+    alpha=None,
+    target=4,
+    increase=0.5,
+    decrease=2.0,
+    high=10,
+    low=1e-6,
+    minlastfailed=3,
+    theta_target=0.25,
+    delta_target=0.25,
+    alpha_target=0.3,
+):
+    """Adapt the step-width by error indicators of the last step. The factor of the
+    step-width is the minimum of the factors of all available indicators, which
+    aim at a target number of iterations, a target (first) contraction rate of the
+    Newton-iterations, a target distance of the predicted and the corrected solution
+    and a target angle between the last two secants of the path.
+
+    Parameters
+    ----------
+    x0 : ndarray
+        1d-array with the initial max. allowed increase of the extended unknowns
+    xn : ndarray
+        1d-array with the current max. allowed increase of the extended unknowns
+    success : bool
+        flag of the converged step
+    n : int
+        number of Newton-iterations of the step
+    lastfailed : int
+        number of converged steps since the last failed step
+    theta : float or None, optional
+        first contraction rate of the Newton-iterations (~ h^2, default is None)
+    delta : float or None, optional
+        distance of the predicted and the corrected solution relative to the step
+        (~ h, default is None)
+    alpha : float or None, optional
+        angle between the last two secants of the path (~ h, default is None)
+    target : int, optional
+        target number of Newton-iterations (default is 4)
+    increase : float, optional
+        max. relative increase of the step-width (default is 0.5)
+    decrease : float, optional
+        decrease factor of a failed step (default is 2.0)
+    high : float, optional
+        max. factor of the step-width w.r.t. to the initial values (default is 10)
+    low : float, optional
+        min. factor of the step-width w.r.t. to the initial values (default is 1e-6)
+    minlastfailed : int, optional
+        increase only after a given number of converged steps (default is 3)
+    theta_target : float, optional
+        target contraction rate (default is 0.25)
+    delta_target : float, optional
+        target relative distance of the predicted and corrected solution (default is
+        0.25)
+    alpha_target : float, optional
+        target angle between the last two secants in rad (default is 0.3)
+
+    Returns
+    -------
+    y : ndarray
+        1d-array with the adapted max. allowed increase of the extended unknowns
+    rebalanced : bool
+        flag of the changed step-width
+    lastfailed : int
+        number of converged steps since the last failed step
+    """
+
+    rebalanced = True
+
+    if success:
+        lastfailed += 1
+
+        # factors of the indicators
+        factors = [np.sqrt(target / max(n, 1))]
+
+        if theta is not None:
+            factors.append(np.sqrt(theta_target / max(theta, 1e-12)))
+
+        if delta is not None:
+            factors.append(delta_target / max(delta, 1e-12))
+
+        if alpha is not None:
+            factors.append(alpha_target / max(alpha, 1e-12))
+
+        factor = min(factors)
+
+        if lastfailed < minlastfailed:
+            factor = min(factor, 1.0)
+
+        x = xn * np.clip(factor, 1 / decrease, 1 + increase)
+
+    else:
+        x = xn / decrease
+        lastfailed = 0
+
+    y = np.maximum(np.minimum(x / x0, high), low) * x0
+    if y[0] == xn[0]:
+        rebalanced = False
+
+    return y, rebalanced, lastfailed
@@ -0,0 +1,169 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .numcont import solve
+from .path import ContinuationPath
+
+# shared arrays of the worker processes (attached by the initializer)
+_shared = ()
+_blocks = []
+
+
+def _share(arrays):
+    "Copy the arrays to shared memory blocks and return the blocks and their specs."
+
+    blocks = []
+    specs = []
+
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+
+        blocks.append(block)
+        specs.append((block.name, array.shape, array.dtype.str))
+
+    return blocks, specs
+
+
+def _attach(specs):
+    "Attach the shared memory blocks as read-only arrays (in a worker process)."
+
+    global _shared
+
+    arrays = []
+
+    for name, shape, dtype in specs:
+        if sys.version_info >= (3, 13):
+            block = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # the blocks are owned (and unlinked) by the main process, i.e. they
+            # must not be registered by the resource tracker of the worker
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+
+            try:
+                block = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.flags.writeable = False
+
+        _blocks.append(block)
+        arrays.append(array)
+
+    _shared = tuple(arrays)
+
+
+def _compact(path):
+    "Return a copy of the path without the unused preallocated states."
+
+    return ContinuationPath.from_arrays(
+        path.y.copy(),
+        path.control.copy(),
+        path.niterations.copy(),
+        path.residual_norm.copy(),
+        path.status.copy(),
+    )
+
+
+def _run(fun, x0, lpf0, args, shared, kwargs):
+    "Run a continuation and return the compact path or the raised exception."
+
+    try:
+        results = solve(fun, x0, lpf0, args=(*args, *shared), **kwargs)
+        return _compact(ContinuationPath(results))
+
+    except Exception as error:
+        return error
+
+
+def _worker(fun, x0, lpf0, args, kwargs):
+    "Run a continuation in a worker process with the attached shared arrays."
+
+    return _run(fun, x0, lpf0, args, _shared, kwargs)
+
+
+def solve_many(fun, x0, lpf0, args_list, workers=None, shared=(), **kwargs):
+    """Run independent continuations of the same equilibrium equations with
+    different arguments in a process pool.
+
+    Parameters
+    ----------
+    fun : function
+        function in terms of unknows x, the load-proportionality-factor lpf and
+        optional args which returns the equilibrium equations. The function must be
+        picklable, i.e. defined on module level.
+    x0 : ndarray
+        1d-array of initial unknows
+    lpf0 : float
+        initial load-proportionality-factor
+    args_list : list of tuple
+        the arguments of the function per continuation
+    workers : int or None, optional
+        number of worker processes. If 1, the continuations are run in the current
+        process. If None, the number of processors is used (default is None).
+    shared : tuple of ndarray, optional
+        large arrays which are passed (after the arguments of a continuation) to
+        all continuations. They are copied once to shared memory and are attached
+        read-only by each worker process instead of being pickled per continuation
+        (default is ()).
+    **kwargs : dict, optional
+        optional keyword-arguments of :func:`contique.solve` (the reporter is
+        silent by default).
+
+    Returns
+    -------
+    list of ContinuationPath or Exception
+        the compact paths in the order of the arguments. If a continuation failed,
+        the raised exception is returned in place of its path.
+
+    Examples
+    --------
+    >>> paths = contique.solve_many(fun, x0, lpf0, [(a, L, EA) for a in angles])
+    >>> lpf = [path.y[:, -1] for path in paths]
+
+    """
+
+    kwargs.setdefault("reporter", None)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        return [_run(fun, x0, lpf0, args, shared, kwargs) for args in args_list]
+
+    blocks, specs = _share(shared)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach, initargs=(specs,)
+        ) as executor:
+            futures = [
+                executor.submit(_worker, fun, x0, lpf0, args, kwargs)
+                for args in args_list
+            ]
+
+            # collect the results in the order of the submission and isolate
+            # failed tasks (e.g. a crashed worker process or unpicklable results)
+            results = []
+
+            for future in futures:
+                error = future.exception()
+                results.append(future.result() if error is None else error)
+
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return results
@@ -0,0 +1,227 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+"""
+
+import numpy as np
+
+
+class Step:
+    """A view on a single state of a :class:`ContinuationPath`.
+
+    Attributes
+    ----------
+    y : ndarray
+        1d-array of the extended unknowns ``y = [x, lpf]``
+    x : ndarray
+        1d-array of the extended unknowns (alias of ``y``, like ``NewtonResult.x``)
+    control : tuple of int
+        tuple of control component and sign
+    niterations : int
+        number of performed Newton-iterations
+    residual_norm : float
+        norm of the extended equilibrium equations
+    status : int
+        integer representig the status of the solution (0 if not converged, 1 if
+        converged).
+
+    """
+
+    __slots__ = ("path", "index")
+
+    def __init__(self, path, index):
+        self.path = path
+        self.index = index
+
+    @property
+    def y(self):
+        return self.path.y[self.index]
+
+    @property
+    def x(self):
+        return self.path.y[self.index]
+
+    @property
+    def control(self):
+        return tuple(self.path.control[self.index])
+
+    @property
+    def niterations(self):
+        return self.path.niterations[self.index]
+
+    @property
+    def residual_norm(self):
+        return self.path.residual_norm[self.index]
+
+    @property
+    def status(self):
+        return self.path.status[self.index]
+
+
+class ContinuationPath:
+    """A compact path of states of equilibrium, stored in preallocated and growable
+    arrays. The results of :func:`contique.solve` are appended without keeping their
+    jacobians or equilibrium equations.
+
+    Parameters
+    ----------
+    results : iterable of NewtonResult, optional
+        Results (e.g. the generator of :func:`contique.solve`) which are appended to
+        the path (default is None).
+    capacity : int, optional
+        Initial number of preallocated states (default is 64). The capacity is
+        doubled if the arrays are full.
+
+    Attributes
+    ----------
+    y : ndarray
+        2d-array of the extended unknowns ``y = [x, lpf]`` per state
+    control : ndarray
+        2d-array of control component and sign per state
+    niterations : ndarray
+        1d-array of the number of performed Newton-iterations per state
+    residual_norm : ndarray
+        1d-array of the norm of the extended equilibrium equations per state
+    status : ndarray
+        1d-array of the status per state
+
+    Examples
+    --------
+    >>> path = contique.ContinuationPath(contique.solve(fun, x0, lpf0))
+    >>> path.y[:, -1]  # load-proportionality-factor
+    >>> path[-1].x  # extended unknowns of the last state
+
+    """
+
+    def __init__(self, results=None, capacity=64):
+        self._length = 0
+        self._capacity = capacity
+        self._y = None
+        self._control = np.zeros((capacity, 2), dtype=int)
+        self._niterations = np.zeros(capacity, dtype=int)
+        self._residual_norm = np.zeros(capacity)
+        self._status = np.zeros(capacity, dtype=int)
+
+        if results is not None:
+            self.extend(results)
+
+    def _grow(self):
+        "Double the capacity of the arrays."
+
+        self._capacity *= 2
+
+        for name in ["_y", "_control", "_niterations", "_residual_norm", "_status"]:
+            array = getattr(self, name)
+            grown = np.zeros((self._capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[: self._length] = array[: self._length]
+            setattr(self, name, grown)
+
+    @classmethod
+    def from_arrays(cls, y, control, niterations, residual_norm, status):
+        """Create a path from given arrays without copying them (e.g. memory-mapped
+        arrays of :func:`contique.io.load`).
+
+        Parameters
+        ----------
+        y : ndarray
+            2d-array of the extended unknowns per state
+        control : ndarray
+            2d-array of control component and sign per state
+        niterations : ndarray
+            1d-array of the number of performed Newton-iterations per state
+        residual_norm : ndarray
+            1d-array of the norm of the extended equilibrium equations per state
+        status : ndarray
+            1d-array of the status per state
+
+        Returns
+        -------
+        ContinuationPath
+            The path with the given arrays.
+        """
+
+        path = cls(capacity=max(1, len(y)))
+        path._y = y
+        path._control = control
+        path._niterations = niterations
+        path._residual_norm = residual_norm
+        path._status = status
+        path._length = len(y)
+
+        return path
+
+    def clear(self):
+        "Remove all states of the path (the allocated arrays are re-used)."
+
+        self._length = 0
+
+    def append(self, res):
+        """Append a result to the path.
+
+        Parameters
+        ----------
+        res : NewtonResult
+            The result of a step with the final extended unknowns ``res.x``.
+        """
+
+        if self._y is None:
+            self._y = np.zeros((self._capacity, len(res.x)))
+
+        if self._length == self._capacity:
+            self._grow()
+
+        i = self._length
+        self._y[i] = res.x
+        self._control[i] = getattr(res, "control", (-1, 0))
+        self._niterations[i] = res.niterations
+        self._residual_norm[i] = np.linalg.norm(res.fun)
+        self._status[i] = res.status
+        self._length += 1
+
+    def extend(self, results):
+        """Append the results of an iterable to the path.
+
+        Parameters
+        ----------
+        results : iterable of NewtonResult
+            Results (e.g. the generator of :func:`contique.solve`) which are appended
+            to the path.
+        """
+
+        for res in results:
+            self.append(res)
+
+    @property
+    def y(self):
+        if self._y is None:
+            return np.zeros((0, 0))
+        return self._y[: self._length]
+
+    @property
+    def control(self):
+        return self._control[: self._length]
+
+    @property
+    def niterations(self):
+        return self._niterations[: self._length]
+
+    @property
+    def residual_norm(self):
+        return self._residual_norm[: self._length]
+
+    @property
+    def status(self):
+        return self._status[: self._length]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Index out of range.")
+        return Step(self, index)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield Step(self, index)
@@ -2,6 +2,8 @@
 contique: Numerical continuation of nonlinear equilibrium equations.
 """
 
+import logging
+
 import numpy as np
 
 
@@ -51,3 +53,154 @@ def errorcontrol():
 def errorfinal():
     print("")
     print("ERROR. Numerical continuation stopped.")
+
+
+def record(step, cycl, control0, res, overshoot):
+    "Return a structured record of a cycle."
+
+    return {
+        "event": "cycle",
+        "step": int(step),
+        "cycle": int(cycl),
+        "control0": (int(control0[0]), int(control0[1])),
+        "control": (int(res.control[0]), int(res.control[1])),
+        "norm": float(np.linalg.norm(res.fun)),
+        "niterations": int(res.niterations),
+        "status": int(res.status),
+        "overshoot": bool(max(abs(res.dys)) <= overshoot),
+    }
+
+
+class Silent:
+    "A reporter without any output (and without formatting)."
+
+    def header(self):
+        pass
+
+    def cycle(self, step, cycl, control0, res, overshoot):
+        pass
+
+    def errorcontrol(self):
+        pass
+
+    def errorfinal(self):
+        pass
+
+
+class Table(Silent):
+    "A reporter which prints a formatted table line for every cycle."
+
+    def header(self):
+        header()
+
+    def cycle(self, step, cycl, control0, res, overshoot):
+        cycle(
+            step,
+            cycl,
+            control0,
+            res.control,
+            res.status,
+            np.linalg.norm(res.fun),
+            res.niterations,
+            max(abs(res.dys)) <= overshoot,
+        )
+
+    def errorcontrol(self):
+        errorcontrol()
+
+    def errorfinal(self):
+        errorfinal()
+
+
+class Callback(Silent):
+    "A reporter which passes structured records of the cycles to a function."
+
+    def __init__(self, fun):
+        self.fun = fun
+
+    def cycle(self, step, cycl, control0, res, overshoot):
+        self.fun(record(step, cycl, control0, res, overshoot))
+
+    def errorcontrol(self):
+        self.fun({"event": "errorcontrol"})
+
+    def errorfinal(self):
+        self.fun({"event": "errorfinal"})
+
+
+class Logger(Silent):
+    """A reporter which logs structured records of the cycles (as ``extra``
+    attribute ``contique``) to a logger. Records are only created if the logger is
+    enabled for the level."""
+
+    def __init__(self, logger, level=logging.INFO):
+        self.logger = logger
+        self.level = level
+
+    def cycle(self, step, cycl, control0, res, overshoot):
+        if self.logger.isEnabledFor(self.level):
+            rec = record(step, cycl, control0, res, overshoot)
+            self.logger.log(
+                self.level,
+                "step %d, cycle %d: control %s => %s, norm %.1e (%d#), status %d",
+                rec["step"],
+                rec["cycle"],
+                rec["control0"],
+                rec["control"],
+                rec["norm"],
+                rec["niterations"],
+                rec["status"],
+                extra={"contique": rec},
+            )
+
+    def errorcontrol(self):
+        self.logger.error(
+            "Control component changed in last cycle. Possible solution: Reduce "
+            "stepwidth.",
+            extra={"contique": {"event": "errorcontrol"}},
+        )
+
+    def errorfinal(self):
+        self.logger.error(
+            "Numerical continuation stopped.",
+            extra={"contique": {"event": "errorfinal"}},
+        )
+
+
+def reporter(kind="table"):
+    """Return a reporter of the cycles of a continuation.
+
+    Parameters
+    ----------
+    kind : None, str, logging.Logger or callable, optional
+        The reporter. None is silent, ``"table"`` prints a formatted table, a logger
+        logs the cycles and a callable is called with a dict of a structured
+        record per cycle, i.e. the keys ``event``, ``step``, ``cycle``,
+        ``control0``, ``control``, ``norm``, ``niterations``, ``status`` and
+        ``overshoot`` (default is "table").
+
+    Returns
+    -------
+    Silent
+        The reporter with the methods ``header()``, ``cycle(step, cycl, control0,
+        res, overshoot)``, ``errorcontrol()`` and ``errorfinal()``.
+    """
+
+    if kind is None:
+        return Silent()
+
+    if isinstance(kind, str) and kind == "table":
+        return Table()
+
+    if isinstance(kind, logging.Logger):
+        return Logger(kind)
+
+    if isinstance(kind, Silent):
+        return kind
+
+    if callable(kind):
+        return Callback(kind)
+
+    raise ValueError(
+        'Reporter must be either None, "table", a logging.Logger or a callable.'
+    )
@@ -0,0 +1,201 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+"""
+
+import json
+import os
+import threading
+from time import perf_counter
+
+
+class Stats:
+    """Counters and accumulated times of the phases of a continuation.
+
+    Attributes
+    ----------
+    counts : dict
+        number of calls (or events) per phase
+    times : dict
+        accumulated wall-times in seconds per phase (the time of the assembly of
+        the extended jacobians is the time of :func:`jacxt` without the evaluation
+        of the jacobian)
+
+    Phases
+    ------
+    residual
+        evaluations of the equilibrium equations (including the evaluations of a
+        finite-differences jacobian)
+    jacobian, fd_jacobian
+        evaluations of a user-defined or a finite-differences jacobian
+    jacxt, assembly
+        evaluations of the extended jacobian and its assembly
+    linsolve
+        solutions of linear equation systems (including the factorizations)
+    iteration
+        Newton-Rhapson iterations
+    cycle, recycle
+        cycles and re-cycles (with a new control component) of the steps
+    step
+        steps (including failed and retried steps)
+    """
+
+    def __init__(self, counts=None, times=None):
+        self.counts = dict(counts or {})
+        self.times = dict(times or {})
+
+        # time of the assembly of the extended jacobian
+        if "jacxt" in self.times:
+            self.times["assembly"] = self.times["jacxt"] - (
+                self.times.get("jacobian", 0.0) + self.times.get("fd_jacobian", 0.0)
+            )
+
+    def __sub__(self, other):
+        counts = {k: v - other.counts.get(k, 0) for k, v in self.counts.items()}
+        times = {k: v - other.times.get(k, 0.0) for k, v in self.times.items()}
+        return Stats(counts, times)
+
+    def __repr__(self):
+        lines = ["Stats:"]
+        for name, count in self.counts.items():
+            time = self.times.get(name)
+            if time is None:
+                lines.append(f"  {name:12s} {count:8d}")
+            else:
+                lines.append(f"  {name:12s} {count:8d} {time:12.6f} s")
+        if "assembly" in self.times:
+            lines.append(f"  {'assembly':12s} {'':8s} {self.times['assembly']:12.6f} s")
+        return "\n".join(lines)
+
+
+class Profiler:
+    """Count and time the phases of a continuation. A profiler is enabled by
+    ``contique.solve(profile=True)`` (or by passing an instance of a profiler) and
+    the functions of the continuation are only wrapped if it is enabled.
+
+    Attributes
+    ----------
+    counts : dict
+        number of calls (or events) per phase
+    times : dict
+        accumulated wall-times in seconds per phase
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.times = {}
+
+        # the phases may be stopped by several threads, e.g. the residuals of a
+        # threaded finite-differences jacobian
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        "Count an event without a duration."
+
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def start(self, name, **args):
+        "Start a phase and return its start time."
+
+        return perf_counter()
+
+    def stop(self, name, start, **args):
+        "Stop a phase with a given start time."
+
+        end = perf_counter()
+
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.times[name] = self.times.get(name, 0.0) + end - start
+
+    def timed(self, name, fun):
+        "Return a wrapped function whose calls are counted and timed as a phase."
+
+        def wrapper(*args, **kwargs):
+            start = self.start(name)
+            try:
+                return fun(*args, **kwargs)
+            finally:
+                self.stop(name, start)
+
+        return wrapper
+
+    def snapshot(self):
+        "Return the current counters and times."
+
+        return Stats(self.counts, self.times)
+
+
+class Tracer(Profiler):
+    """A profiler which additionally records a timeline of all phases (steps,
+    cycles, iterations, residuals, jacobians and linear solutions) with their start
+    and end times. The timeline is exported in the Chrome trace event format (e.g.
+    for ``chrome://tracing`` or https://ui.perfetto.dev).
+
+    Attributes
+    ----------
+    events : list of dict
+        the recorded trace events
+
+    Examples
+    --------
+    >>> tracer = contique.Tracer()
+    >>> res = list(contique.solve(fun, x0, lpf0, profile=tracer))
+    >>> tracer.export("run.json")
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.origin = perf_counter()
+        self.pid = os.getpid()
+
+    def count(self, name):
+        "Count and record an instant event."
+
+        super().count(name)
+        self.events.append(
+            {
+                "name": name,
+                "ph": "i",
+                "s": "t",
+                "ts": (perf_counter() - self.origin) * 1e6,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+            }
+        )
+
+    def stop(self, name, start, **args):
+        "Stop a phase with a given start time and record a complete event."
+
+        end = perf_counter()
+        super().stop(name, start, **args)
+        self.events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": {k: int(v) for k, v in args.items()},
+            }
+        )
+
+    def trace(self):
+        "Return the timeline as a dict in the Chrome trace event format."
+
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        """Export the timeline as a JSON-file in the Chrome trace event format.
+
+        Parameters
+        ----------
+        path : str
+            The JSON-file of the timeline.
+        """
+
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
@@ -0,0 +1,182 @@
+"""
+contique: Numerical continuation of nonlinear equilibrium equations.
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg as splinalg
+
+from .newton import krylov
+
+
+class ILUGMRES:
+    """An iterative linear solver (restarted GMRES) with an incomplete LU
+    factorization as preconditioner, which is re-used for subsequent matrices.
+
+    Linear solvers with separate setup and solve phases provide a method
+    ``setup(A)`` which returns a function ``b -> x`` that solves ``A x = b``. They
+    may be passed to :func:`contique.solve` by ``solve=...``. The (expensive) setup
+    of the preconditioner is skipped as long as the matrices change only slightly,
+    i.e. the preconditioner of a previous matrix is re-used for the Newton-Rhapson
+    iterations and the steps of the continuation.
+
+    The preconditioner is refreshed (re-factorized) on the next setup if the
+    number of Krylov iterations of a solution exceeds
+    ``max(refresh * n0, mincount)``, where ``n0`` is the number of Krylov
+    iterations of the first solution with the refreshed preconditioner. If the
+    tolerance is not reached with a re-used preconditioner, the preconditioner is
+    refreshed immediately and the solution is repeated.
+
+    Parameters
+    ----------
+    rtol : float, optional
+        relative tolerance of the residual of the linear equations (default is
+        1e-10)
+    restart : int, optional
+        number of iterations between restarts of GMRES (default is 30)
+    maxiter : int or None, optional
+        max. number of Krylov iterations per solution (default is None, which is
+        ``10 * restart``)
+    drop_tol : float, optional
+        drop tolerance of the incomplete LU factorization (default is 1e-4)
+    fill_factor : float, optional
+        max. fill ratio of the incomplete LU factorization (default is 10)
+    refresh : float, optional
+        max. ratio of the Krylov iterations w.r.t. the Krylov iterations with the
+        refreshed preconditioner (default is 2.0)
+    mincount : int, optional
+        min. number of Krylov iterations which trigger a refresh (default is 10)
+
+    Attributes
+    ----------
+    nsetups : int
+        number of setups (matrices)
+    nrefresh : int
+        number of incomplete LU factorizations
+    iterations : list of int
+        number of Krylov iterations per solution
+
+    Examples
+    --------
+    >>> linsolve = contique.ILUGMRES(refresh=2.0)
+    >>> res = contique.solve(fun, x0, lpf0, jacsparsity="auto", solve=linsolve)
+    >>> linsolve.nrefresh, linsolve.nsetups
+
+    """
+
+    def __init__(
+        self,
+        rtol=1e-10,
+        restart=30,
+        maxiter=None,
+        drop_tol=1e-4,
+        fill_factor=10,
+        refresh=2.0,
+        mincount=10,
+    ):
+        self.rtol = rtol
+        self.restart = restart
+        self.maxiter = maxiter
+        self.drop_tol = drop_tol
+        self.fill_factor = fill_factor
+        self.refresh = refresh
+        self.mincount = mincount
+
+        self.nsetups = 0
+        self.nrefresh = 0
+        self.iterations = []
+
+        # init the preconditioner and the Krylov iterations of its first solution
+        self._preconditioner = None
+        self._shape = None
+        self._count0 = None
+        self._stale = True
+
+    def _factorize(self, A):
+        "Refresh the preconditioner by an incomplete LU factorization of A."
+
+        try:
+            factorized = splinalg.spilu(
+                A, drop_tol=self.drop_tol, fill_factor=self.fill_factor
+            )
+            preconditioner = splinalg.LinearOperator(A.shape, factorized.solve)
+        except RuntimeError:
+            # singular factor, solve without a preconditioner
+            preconditioner = None
+
+        self._preconditioner = preconditioner
+        self._shape = A.shape
+        self._count0 = None
+        self._stale = False
+        self.nrefresh += 1
+
+    def _krylov(self, A, b):
+        "Solve the linear equations with the current preconditioner."
+
+        count = [0]
+
+        def callback(*args):
+            count[0] += 1
+
+        x = krylov(
+            A,
+            b,
+            rtol=self.rtol,
+            restart=self.restart,
+            M=self._preconditioner,
+            maxiter=self.maxiter,
+            callback=callback,
+        )
+
+        # check the (true) residual of the linear equations
+        converged = np.linalg.norm(A @ x - b) <= self.rtol * np.linalg.norm(b)
+
+        return x, count[0], converged
+
+    def setup(self, A):
+        """Setup the linear solver for a given matrix. The preconditioner is only
+        refreshed if it is stale (or for a new shape of the matrix).
+
+        Parameters
+        ----------
+        A : ndarray or sparse matrix
+            the 2d-array or sparse matrix of the linear equation system
+
+        Returns
+        -------
+        callable
+            a function ``b -> x`` which solves ``A x = b``
+        """
+
+        A = sparse.csc_matrix(A)
+        self.nsetups += 1
+
+        if self._stale or self._shape != A.shape:
+            self._factorize(A)
+
+        def solve(b):
+            x, count, converged = self._krylov(A, b)
+
+            if not converged and self._count0 is not None:
+                # refresh the re-used preconditioner and repeat the solution
+                self._factorize(A)
+                x, count, converged = self._krylov(A, b)
+
+            self.iterations.append(count)
+
+            if self._count0 is None:
+                # Krylov iterations with the refreshed preconditioner
+                self._count0 = count
+
+            # the preconditioner is refreshed on the next setup
+            if not converged or count > max(self.refresh * self._count0, self.mincount):
+                self._stale = True
+
+            return x
+
+        return solve
+
+    def __call__(self, A, b):
+        "Setup the linear solver for A and return the solution of ``A x = b``."
+
+        return self.setup(A)(b)
@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+import numpy as np
+
+import contique
+
+
+def fun(x, l, a):
+    r = a * l
+    return np.array([-x[0] + r * np.cos(l), -x[1] + r * np.sin(l)])
+
+
+def test_archimedean_spiral_io():
+    # initial solution
+    x0 = np.zeros(2)
+    lpf0 = 0.0
+
+    # additional function arguments
+    a = 1
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        args=(a,),
+        lpf0=lpf0,
+        dxmax=0.2,
+        dlpfmax=0.2,
+        maxsteps=100,
+        maxcycles=4,
+        maxiter=8,
+        tol=1e-10,
+        overshoot=1.05,
+    )
+
+    # reference solution in memory
+    path = contique.ContinuationPath(contique.solve(**kwargs))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run = os.path.join(tmp, "run")
+
+        # stream the path to disk in chunks (without keeping the results)
+        with contique.io.MemmapWriter(run, chunksize=16) as writer:
+            for res in contique.solve(writer=writer, **kwargs):
+                pass
+
+            # the buffered states are written at the end of the continuation
+            assert writer.length == len(path)
+
+        # read the path back as memory-mapped arrays
+        loaded = contique.io.load(run)
+
+        assert isinstance(loaded.y, np.memmap)
+        assert len(loaded) == len(path)
+        assert np.allclose(loaded.y, path.y)
+        assert np.all(loaded.control == path.control)
+        assert np.all(loaded.niterations == path.niterations)
+        assert np.allclose(loaded.residual_norm, path.residual_norm)
+        assert np.all(loaded.status == path.status)
+        assert np.allclose(loaded[-1].x, path[-1].x)
+
+        # a path may also be used as a writer
+        sink = contique.ContinuationPath()
+        for res in contique.solve(writer=sink, **kwargs):
+            pass
+
+        assert np.allclose(sink.y, path.y)
+
+        # an empty path
+        contique.io.MemmapWriter(run).close()
+        assert len(contique.io.load(run)) == 0
+
+        # release the memory-mapped files
+        del loaded
+
+
+if __name__ == "__main__":
+    test_archimedean_spiral_io()
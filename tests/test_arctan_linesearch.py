@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import contique
+from contique.newton import newtonrhapson
+
+
+def fun(x, lpf):
+    return np.arctan(x - 5 * lpf**2)
+
+
+def test_newton_linesearch():
+    def f(x):
+        return np.arctan(x)
+
+    def dfdx(x):
+        return np.array([[1 / (1 + x[0] ** 2)]])
+
+    # full Newton steps diverge for |x0| > 1.39
+    x0 = np.array([3.0])
+
+    with np.errstate(all="ignore"):
+        res = newtonrhapson(f, x0.copy(), dfdx, maxiter=20, tol=1e-10)
+
+    assert not res.success
+
+    res = newtonrhapson(f, x0.copy(), dfdx, maxiter=20, tol=1e-10, method="linesearch")
+
+    assert res.success
+    assert np.allclose(res.x, 0)
+
+    # the iterations stop if the line search does not decrease the norm
+    def g(x):
+        return x**2 + 1
+
+    def dgdx(x):
+        return np.array([[2 * x[0]]])
+
+    res = newtonrhapson(g, np.array([0.5]), dgdx, maxiter=100, method="linesearch")
+
+    assert not res.success
+    assert res.niterations < 100
+    assert res.message == "Newton-R. line search failed."
+
+
+def test_arctan_linesearch():
+    kwargs = dict(
+        fun=fun,
+        x0=np.zeros(1),
+        lpf0=0.0,
+        dxmax=100,
+        dlpfmax=1.0,
+        maxsteps=10,
+        maxiter=20,
+        tol=1e-10,
+        reporter=None,
+    )
+
+    # the full Newton steps of the first step diverge
+    with np.errstate(all="ignore"):
+        Res = list(contique.solve(**kwargs))
+
+    assert len(Res) == 1
+
+    # the steps are rescued by the line search
+    Res = list(contique.solve(newton="linesearch", **kwargs))
+    X = np.array([res.x for res in Res])
+
+    assert len(Res) == 11
+    assert np.allclose(X[:, 0], 5 * X[:, 1] ** 2)
+
+
+if __name__ == "__main__":
+    test_newton_linesearch()
+    test_arctan_linesearch()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import contique
+from contique.newton import newtonrhapson
+
+
+def fun(x, lpf):
+    n = len(x)
+    h = 1 / (n - 1)
+    A = np.diag(2 * np.ones_like(x) / h**2)
+    for i in [1, -1]:
+        A -= np.diag(np.ones_like(x[:-1]) / h**2, i)
+    f = -A.dot(x) + lpf * np.exp(x)
+    for i in [0, -1]:
+        f[i] = x[i]
+    return f
+
+
+def test_newton_chord():
+    njac = [0]
+
+    def f(x):
+        return np.array([x[0] ** 2 + x[1] - 3, x[0] - x[1] ** 3 + 1])
+
+    def dfdx(x):
+        njac[0] += 1
+        return np.array([[2 * x[0], 1], [1, -3 * x[1] ** 2]])
+
+    x0 = np.array([1.2, 1.1])
+    res = newtonrhapson(f, x0, dfdx, maxiter=50, tol=1e-12, method="chord")
+
+    assert res.success
+    assert np.allclose(f(res.x), 0)
+    assert njac[0] < res.niterations
+
+    with pytest.raises(ValueError):
+        newtonrhapson(f, x0, dfdx, method="quasi-newton")
+
+
+def test_bratu_chord():
+    # initial solution
+    n = 51
+    lpf0 = 0.0
+    x0 = np.zeros(n)
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.5,
+        dlpfmax=0.5,
+        maxsteps=22,
+        maxiter=20,
+        tol=1e-10,
+    )
+
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+
+    for refactor_every in [None, 3]:
+        Res = contique.solve(newton="chord", refactor_every=refactor_every, **kwargs)
+        Y = np.array([res.x for res in Res])
+
+        assert np.allclose(X, Y)
+
+
+if __name__ == "__main__":
+    test_newton_chord()
+    test_bratu_chord()
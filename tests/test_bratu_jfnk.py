@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from scipy.sparse import linalg as splinalg
+
+import contique
+
+
+def fun(x, lpf):
+    n = len(x)
+    h = 1 / (n - 1)
+    f = lpf * np.exp(x)
+    f[1:-1] += (x[:-2] - 2 * x[1:-1] + x[2:]) / h**2
+    for i in [0, -1]:
+        f[i] = x[i]
+    return f
+
+
+def pattern(n):
+    return sparse.diags([1, 1, 1], [-1, 0, 1], shape=(n, n), dtype=bool)
+
+
+def test_bratu_jfnk():
+    n = 51
+    x0 = np.zeros(n)
+    lpf0 = 0.0
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.5,
+        dlpfmax=0.5,
+        maxsteps=10,
+        tol=1e-10,
+        reporter=None,
+    )
+
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+
+    # restarted GMRES and BiCGStab with an incomplete LU preconditioner of the
+    # sparse jacobian
+    for krylov in ["gmres", "bicgstab"]:
+        Res = contique.solve(
+            newton="jfnk",
+            krylov=krylov,
+            preconditioner="ilu",
+            jacsparsity=pattern(n),
+            **kwargs,
+        )
+        Y = np.array([res.x for res in Res])
+
+        assert Y.shape == X.shape
+        assert np.allclose(X, Y)
+
+    # the incomplete LU factorization requires a sparse jacobian
+    with pytest.raises(ValueError):
+        next(contique.solve(newton="jfnk", preconditioner="ilu", **kwargs))
+
+    # restarted GMRES (restart < n) with a user-defined preconditioner
+    def laplacian(y0, *args):
+        "Return the inverse of the tridiagonal Laplacian, extended by the lpf."
+
+        h = 1 / (n - 1)
+        A = sparse.diags([1.0, -2.0, 1.0], [-1, 0, 1], shape=(n, n)).tolil() / h**2
+        A[0], A[-1] = 0, 0
+        A[0, 0], A[-1, -1] = 1, 1
+        lu = splinalg.splu(sparse.block_diag([A, 1], format="csc"))
+
+        return splinalg.LinearOperator(lu.shape, lu.solve)
+
+    # the jacobian is never evaluated (jacobian-free by default)
+    profiler = contique.Profiler()
+    Res = contique.solve(
+        newton="jfnk",
+        restart=10,
+        preconditioner=laplacian,
+        profile=profiler,
+        **kwargs,
+    )
+    Y = np.array([res.x for res in Res])
+
+    assert Y.shape == X.shape
+    assert np.allclose(X, Y)
+    assert "fd_jacobian" not in profiler.counts
+    assert "jacxt" not in profiler.counts
+
+
+def test_bratu_preconditioner_unused():
+    n = 51
+    calls = []
+
+    def preconditioner(y0, *args):
+        calls.append(y0)
+        return None
+
+    # the preconditioner is only evaluated by the jacobian-free Newton-Krylov method
+    for newton in ["newton", "chord", "linesearch"]:
+        Res = contique.solve(
+            fun=fun,
+            x0=np.zeros(n),
+            lpf0=0.0,
+            dxmax=0.5,
+            dlpfmax=0.5,
+            maxsteps=2,
+            tol=1e-10,
+            newton=newton,
+            preconditioner=preconditioner,
+            reporter=None,
+        )
+        for res in Res:
+            pass
+
+    assert len(calls) == 0
+
+
+if __name__ == "__main__":
+    test_bratu_jfnk()
+    test_bratu_preconditioner_unused()
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+import contique
+
+
+def fun(x, lpf):
+    n = len(x)
+    h = 1 / (n - 1)
+    A = np.diag(2 * np.ones_like(x) / h**2)
+    for i in [1, -1]:
+        A -= np.diag(np.ones_like(x[:-1]) / h**2, i)
+    f = -A.dot(x) + lpf * np.exp(x)
+    for i in [0, -1]:
+        f[i] = x[i]
+    return f
+
+
+def test_bratu_profile():
+    # initial solution
+    n = 21
+    lpf0 = 0.0
+    x0 = np.zeros(n)
+
+    # count the calls of the equilibrium equations
+    ncalls = [0]
+
+    def counted(x, lpf):
+        ncalls[0] += 1
+        return fun(x, lpf)
+
+    kwargs = dict(
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.5,
+        dlpfmax=0.5,
+        maxsteps=22,
+        maxiter=20,
+        tol=1e-10,
+    )
+
+    X = np.array([res.x for res in contique.solve(fun=fun, **kwargs)])
+    profiler = contique.Profiler()
+    Res = list(contique.solve(fun=counted, profile=profiler, **kwargs))
+
+    # profiling does not change the results
+    assert np.array_equal(X, [res.x for res in Res])
+    assert not hasattr(list(contique.solve(fun=fun, **kwargs))[-1], "stats")
+
+    # the profiler counts all calls (including the final failed step)
+    assert profiler.counts["residual"] == ncalls[0]
+    assert profiler.counts["step"] == len(Res)
+
+    # the stats per result sum up to the stats of the whole run
+    total = Res[-1].stats_total
+    assert isinstance(total, contique.Stats)
+    assert sum(res.stats.counts["residual"] for res in Res) == total.counts["residual"]
+    assert total.counts["step"] == len(Res) - 1
+    assert total.counts["cycle"] >= len(Res) - 1
+    assert total.counts["iteration"] == sum(
+        res.stats.counts.get("iteration", 0) for res in Res
+    )
+    assert total.counts["linsolve"] >= total.counts["iteration"]
+    assert total.counts["fd_jacobian"] > 0
+    assert "jacobian" not in total.counts
+    assert total.times["assembly"] >= 0
+    assert total.times["residual"] > 0
+    assert "residual" in repr(total)
+
+    # user-defined jacobian and a given profiler
+    def dfundx(x, lpf, *args):
+        return contique.jacobian(fun)(x, lpf)
+
+    def dfundl(x, lpf, *args):
+        return np.exp(x) * np.array([0] + [1] * (n - 2) + [0])
+
+    profiler = contique.Profiler()
+    Res = list(
+        contique.solve(fun=fun, jac=(dfundx, dfundl), profile=profiler, **kwargs)
+    )
+
+    assert profiler.counts["jacobian"] > 0
+    assert "fd_jacobian" not in profiler.counts
+    assert np.allclose(X, [res.x for res in Res])
+
+    # the (sparse) jacobian of the preconditioner of the Newton-Krylov method is
+    # timed as extended jacobian
+    profiler = contique.Profiler()
+    Res = list(
+        contique.solve(
+            fun=fun,
+            newton="jfnk",
+            preconditioner="ilu",
+            jacsparsity=sparse.diags([1, 1, 1], [-1, 0, 1], shape=(n, n), dtype=bool),
+            profile=profiler,
+            **kwargs,
+        )
+    )
+
+    assert profiler.counts["fd_jacobian"] > 0
+    assert profiler.counts["jacxt"] == profiler.counts["fd_jacobian"]
+    assert profiler.snapshot().times["assembly"] >= 0
+
+
+if __name__ == "__main__":
+    test_bratu_profile()
@@ -0,0 +1,69 @@
+import numpy as np
+from scipy import sparse
+
+import contique
+
+
+def fun(x, lpf):
+    n = len(x)
+    h = 1 / (n - 1)
+    f = lpf * np.exp(x)
+    f[1:-1] += (x[:-2] - 2 * x[1:-1] + x[2:]) / h**2
+    for i in [0, -1]:
+        f[i] = x[i]
+    return f
+
+
+def pattern(n):
+    return sparse.diags([1, 1, 1], [-1, 0, 1], shape=(n, n), dtype=bool)
+
+
+def test_bratu_ilugmres():
+    n = 51
+    x0 = np.zeros(n)
+    lpf0 = 0.0
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.5,
+        dlpfmax=0.5,
+        maxsteps=10,
+        tol=1e-10,
+        jacsparsity=pattern(n),
+        reporter=None,
+    )
+
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+
+    for newton in ["newton", "chord"]:
+        for bordered in [True, False]:
+            linsolve = contique.ILUGMRES()
+            Res = contique.solve(
+                solve=linsolve, newton=newton, bordered=bordered, **kwargs
+            )
+            Y = np.array([res.x for res in Res])
+
+            assert Y.shape == X.shape
+            assert np.allclose(X, Y)
+
+            # the preconditioner is re-used for the iterations and steps
+            assert linsolve.nrefresh < linsolve.nsetups
+            assert len(linsolve.iterations) >= linsolve.nsetups
+
+    # a strict refresh policy refreshes the preconditioner more often
+    strict = contique.ILUGMRES(refresh=1.0, mincount=1)
+    Y = np.array([res.x for res in contique.solve(solve=strict, **kwargs)])
+
+    assert np.allclose(X, Y)
+    assert strict.nrefresh > linsolve.nrefresh
+
+    # the linear solver may also be called like a plain linear solver
+    A = sparse.diags([-1.0, 2.0, -1.0], [-1, 0, 1], shape=(n, n))
+    b = np.ones(n)
+    assert np.allclose(A @ contique.ILUGMRES()(A, b), b)
+
+
+if __name__ == "__main__":
+    test_bratu_ilugmres()
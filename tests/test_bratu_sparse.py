@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+import contique
+
+
+def fun(x, lpf):
+    n = len(x)
+    h = 1 / (n - 1)
+    f = lpf * np.exp(x)
+    f[1:-1] += (x[:-2] - 2 * x[1:-1] + x[2:]) / h**2
+    for i in [0, -1]:
+        f[i] = x[i]
+    return f
+
+
+def pattern(n):
+    return sparse.diags([1, 1, 1], [-1, 0, 1], shape=(n, n), dtype=bool)
+
+
+def test_bratu_jacobian_sparse():
+    n = 51
+    x = np.linspace(0, 1, n) ** 2
+    lpf = 1.5
+
+    for mode in [2, 3, "complex"]:
+        dfdx = contique.jacobian(fun, mode=mode)(x, lpf)
+        dfdx_sparse = contique.jacobian(fun, mode=mode, sparsity=pattern(n))(x, lpf)
+
+        assert sparse.isspmatrix_csr(dfdx_sparse)
+        assert np.allclose(dfdx_sparse.toarray(), dfdx)
+
+        dfdx_vectorized = contique.jacobian(
+            fun, mode=mode, sparsity=pattern(n), vectorized=True
+        )(x, lpf)
+
+        assert np.allclose(dfdx_vectorized.toarray(), dfdx)
+
+    # a tridiagonal pattern is colored by three groups of columns
+    assert contique.colorize(pattern(n)).max() == 2
+
+
+def test_jacobian_sparse_dense_columns():
+    n = 256
+
+    def fun(x):
+        return np.full(n, x[0] * x[1])
+
+    # two dense columns which share a multiple of 256 rows
+    sparsity = np.ones((n, 2), dtype=bool)
+    x = np.array([2.0, 3.0])
+
+    assert np.all(contique.colorize(sparsity) == [0, 1])
+
+    dfdx = contique.jacobian(fun, sparsity=sparsity)(x)
+    assert np.allclose(dfdx.toarray(), np.tile([3.0, 2.0], (n, 1)))
+
+
+def test_bratu_sparse():
+    n = 51
+    x0 = np.zeros(n)
+    lpf0 = 0.0
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.5,
+        dlpfmax=0.5,
+        maxsteps=10,
+        tol=1e-10,
+    )
+
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+    Y = np.array([res.x for res in contique.solve(jacsparsity=pattern(n), **kwargs)])
+
+    assert np.allclose(X, Y)
+
+    # a dense pattern is accepted as well
+    Res = contique.solve(jacsparsity=pattern(n).toarray(), **kwargs)
+    Z = np.array([res.x for res in Res])
+
+    assert np.allclose(X, Z)
+
+    Res = contique.solve(jacsparsity=pattern(n), vectorized=True, **kwargs)
+    Z = np.array([res.x for res in Res])
+
+    assert np.allclose(X, Z)
+
+    Res = contique.solve(jacsparsity=pattern(n), bordered=False, **kwargs)
+    Z = np.array([res.x for res in Res])
+
+    assert np.allclose(X, Z)
+
+    # threaded evaluation of the (grouped) columns gives the same results
+    for jacsparsity in [None, pattern(n)]:
+        Y = [res.x for res in contique.solve(jacsparsity=jacsparsity, **kwargs)]
+        Res = contique.solve(jacsparsity=jacsparsity, jac_workers=4, **kwargs)
+        Z = np.array([res.x for res in Res])
+
+        assert np.array_equal(Y, Z)
+
+
+def test_sparsity_offset():
+    def fun(x):
+        return np.array([1e9 + x[0] + x[1], x[1] ** 2])
+
+    x = np.zeros(2)
+
+    # changes of a function with a large offset are detected
+    detected = contique.sparsity(fun)(x)
+    dfdx = contique.jacobian(fun)(x + 1)
+
+    assert np.array_equal(detected.toarray(), [[True, True], [False, True]])
+    assert np.all(detected.toarray()[dfdx != 0])
+
+
+def test_bratu_sparse_auto():
+    n = 51
+    x0 = np.zeros(n)
+    lpf0 = 0.0
+
+    # detected pattern (tridiagonal except the boundary rows)
+    detected = contique.sparsity(fun)(x0, lpf0)
+    assert np.all(detected.toarray() <= pattern(n).toarray())
+    assert detected.nnz == 3 * (n - 2) + 2
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.5,
+        dlpfmax=0.5,
+        maxsteps=10,
+        tol=1e-10,
+    )
+
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+    Y = np.array([res.x for res in contique.solve(jacsparsity="auto", **kwargs)])
+
+    assert np.allclose(X, Y)
+
+
+if __name__ == "__main__":
+    test_bratu_jacobian_sparse()
+    test_jacobian_sparse_dense_columns()
+    test_bratu_sparse()
+    test_sparsity_offset()
+    test_bratu_sparse_auto()
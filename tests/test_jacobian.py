@@ -0,0 +1,108 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import contique
+from contique.helpers import one_hot
+from contique.newtonxt import funxt, jacxt
+
+
+def fun(x, lpf, payload):
+    payload["calls"] += 1
+    return np.array([x[0] ** 2 + lpf * x[1], np.sin(x[1]) - lpf * x[0]])
+
+
+def dfun(x, lpf, payload):
+    return np.array([[2 * x[0], lpf], [-lpf, np.cos(x[1])]])
+
+
+def test_jacobian_copy_free():
+    x = np.array([0.5, -0.3])
+    lpf = 1.2
+    payload = {"calls": 0, "data": np.ones(1000)}
+
+    for mode, ncalls in [(2, 1 + len(x)), (3, 2 * len(x))]:
+        payload["calls"] = 0
+        dfdx = contique.jacobian(fun, mode=mode)(x, lpf, payload)
+
+        # no wasted evaluations, unchanged input and no copies of the payload
+        assert payload["calls"] == ncalls
+        assert np.all(x == np.array([0.5, -0.3]))
+        assert np.allclose(dfdx, dfun(x, lpf, payload), atol=1e-6)
+
+
+def test_jacobian_int():
+    dfdx = contique.jacobian(lambda x: x**2)(np.arange(3))
+    assert np.allclose(dfdx, np.diag([0, 2, 4]))
+
+
+def test_jacobian_extended():
+    y = np.array([0.5, -0.3, 1.2])
+    payload = {"calls": 0}
+    args = (one_hot(2, 3), y + 0.1, fun, None, 2, None, (payload,), False, {})
+
+    f = funxt(y, *args)
+    payload["calls"] = 0
+    dgdy = jacxt(y, *args)
+
+    # one sweep over the extended unknowns which re-uses the residual of funxt
+    assert payload["calls"] == len(y)
+    assert np.allclose(f, [0.25 - 0.36, np.sin(-0.3) - 0.6, -0.1])
+    assert np.allclose(dgdy[:-1, :-1], dfun(y[:-1], y[-1], payload), atol=1e-6)
+    assert np.allclose(dgdy[:-1, -1], [-0.3, -0.5], atol=1e-6)
+    assert np.allclose(dgdy[-1], one_hot(2, 3))
+
+
+def test_jacobian_workers():
+    x = np.linspace(0.1, 1.0, 12)
+    lpf = 0.7
+    threads = set()
+
+    def fun(x, lpf):
+        # a slow function which releases the GIL
+        threads.add(threading.get_ident())
+        time.sleep(1e-3)
+        return np.append(x**2 * lpf, np.sum(np.sin(x)))
+
+    sparsity = np.ones((13, 12), dtype=bool)
+    sparsity[:12] = np.eye(12, dtype=bool)
+
+    for mode in [2, 3, "complex"]:
+        for pattern in [None, sparsity]:
+            jac = contique.jacobian(fun, mode=mode, sparsity=pattern)
+            dfdx = jac(x, lpf)
+
+            threads.clear()
+            jac = contique.jacobian(fun, mode=mode, sparsity=pattern, workers=3)
+            dfdx_threaded = jac(x, lpf)
+
+            # same jacobian, evaluated by several threads
+            if pattern is not None:
+                dfdx, dfdx_threaded = dfdx.toarray(), dfdx_threaded.toarray()
+
+            assert np.array_equal(dfdx, dfdx_threaded)
+            assert dfdx_threaded.shape == (13, 12)
+            assert len(threads) > 1
+            assert np.all(x == np.linspace(0.1, 1.0, 12))
+
+
+def test_jacobian_workers_profiled():
+    x = np.linspace(0.1, 1.0, 200)
+    profiler = contique.Profiler()
+    fun = profiler.timed("residual", lambda x, lpf: x**2 * lpf)
+
+    # the calls of the threads are counted
+    for repetition in range(5):
+        contique.jacobian(fun, mode=3, workers=4)(x, 0.7)
+
+    assert profiler.counts["residual"] == 5 * 2 * len(x)
+
+
+if __name__ == "__main__":
+    test_jacobian_copy_free()
+    test_jacobian_int()
+    test_jacobian_extended()
+    test_jacobian_workers()
+    test_jacobian_workers_profiled()
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import contique
+
+
+def fun(x, l):
+    a = 1
+    b = 0.1
+    r = a * np.exp(b * l)
+    return np.array([-x[0] + r * np.cos(l), -x[1] + r * np.sin(l)])
+
+
+def test_log_spiral_path():
+    # initial solution
+    x0 = np.array([1, 0])
+    lpf0 = 0.0
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=200,
+        maxcycles=4,
+        maxiter=8,
+        tol=1e-10,
+        overshoot=1.05,
+    )
+
+    # numeric continuation
+    Res = list(contique.solve(**kwargs))
+    X = np.array([res.x for res in Res])
+
+    # results don't keep their jacobians by default
+    assert all([res.jac is None for res in Res])
+    assert all(
+        [res.jac is not None for res in contique.solve(keepjac=True, **kwargs)][1:]
+    )
+
+    # compact path with a small initial capacity
+    path = contique.ContinuationPath(contique.solve(**kwargs), capacity=2)
+
+    assert len(path) == len(Res)
+    assert path.y.shape == X.shape
+    assert np.allclose(path.y, X)
+    assert np.allclose(path[-1].x, X[-1])
+    assert path[-1].control == tuple(Res[-1].control)
+    assert np.all(path.niterations == [res.niterations for res in Res])
+    assert np.all(path.residual_norm[1:] < 1e-10)
+    assert np.all(path.status[1:] == 1)
+    assert np.allclose([step.y for step in path], X)
+
+    with pytest.raises(IndexError):
+        path[len(Res)]
+
+
+if __name__ == "__main__":
+    test_log_spiral_path()
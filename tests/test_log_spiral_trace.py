@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import contique
+
+
+def fun(x, l):
+    a = 1
+    b = 0.1
+    r = a * np.exp(b * l)
+    return np.array([-x[0] + r * np.cos(l), -x[1] + r * np.sin(l)])
+
+
+def test_log_spiral_trace():
+    # initial solution
+    x0 = np.array([1, 0])
+    lpf0 = 0.0
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        lpf0=lpf0,
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=50,
+        maxcycles=4,
+        maxiter=8,
+        tol=1e-10,
+        overshoot=1.05,
+    )
+
+    # numeric continuation with and without a timeline
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+
+    tracer = contique.Tracer()
+    Y = np.array([res.x for res in contique.solve(profile=tracer, **kwargs)])
+
+    assert np.array_equal(X, Y)
+
+    # the timeline contains all phases as complete events
+    events = tracer.trace()["traceEvents"]
+    names = {event["name"] for event in events}
+    assert {"step", "cycle", "iteration", "residual", "linsolve"} <= names
+
+    steps = [event for event in events if event["name"] == "step"]
+    assert len(steps) == tracer.counts["step"] == 50
+    assert [event["args"]["step"] for event in steps] == list(range(1, 51))
+
+    # iterations are nested in their steps
+    iterations = [event for event in events if event["name"] == "iteration"]
+    for event in iterations:
+        assert (
+            any(
+                s["ts"] <= event["ts"] + 1e-3
+                and event["ts"] + event["dur"] <= s["ts"] + s["dur"] + 1e-3
+                for s in steps
+            )
+            or event["ts"] < steps[0]["ts"]
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "trace.json")
+        tracer.export(filename)
+
+        with open(filename, "r") as f:
+            trace = json.load(f)
+
+    assert len(trace["traceEvents"]) == len(events)
+    assert all(event["ph"] in ["X", "i"] for event in trace["traceEvents"])
+
+
+if __name__ == "__main__":
+    test_log_spiral_trace()
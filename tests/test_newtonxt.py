@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from contique.helpers import argparser2
+from contique.newtonxt import newtonxt
+
+
+def fun(x, lpf, a, b):
+    return np.array(
+        [-a * np.sin(x[0]) + x[1] ** 2 + lpf, -b * np.cos(x[1]) * x[1] + lpf]
+    )
+
+
+def test_newtonxt_cache():
+    calls = {"fun": 0, "dfdx": 0}
+
+    def f(x, lpf, a, b):
+        calls["fun"] += 1
+        return fun(x, lpf, a, b)
+
+    def dfdx(x, lpf, a, b):
+        calls["dfdx"] += 1
+        return np.array(
+            [
+                [-a * np.cos(x[0]), 2 * x[1]],
+                [0, b * np.sin(x[1]) * x[1] - b * np.cos(x[1])],
+            ]
+        )
+
+    def dfdl(x, lpf, a, b):
+        return np.ones(2)
+
+    y0 = np.array([0.1, 0.2, 0.3])
+    dymax = np.ones(3) * 0.1
+    args = (argparser2(f), (dfdx, dfdl), y0, (2, 1), dymax)
+
+    # pre-identification, a cycle and a retried cycle share the same base point
+    cache = {}
+    res = newtonxt(*args, args=(1, 1), maxiter=1, cache=cache)
+    res = newtonxt(*args, args=(1, 1), maxiter=8, cache=cache)
+    assert calls["dfdx"] == res.niterations
+    assert calls["fun"] == 2 + res.niterations
+
+    calls["dfdx"] = 0
+    res_retry = newtonxt(*args[:-1], dymax / 2, args=(1, 1), maxiter=8, cache=cache)
+    assert calls["dfdx"] == res_retry.niterations - 1
+
+    # results without cache
+    res_nocache = newtonxt(*args, args=(1, 1), maxiter=8)
+    assert np.allclose(res.x, res_nocache.x)
+
+    # a new base point clears the cache
+    newtonxt(
+        argparser2(f), (dfdx, dfdl), res.x, (2, 1), dymax, args=(1, 1), cache=cache
+    )
+    assert np.allclose(cache["y0"], res.x)
+
+
+def test_newtonxt_bordered():
+    y0 = np.array([0.1, 0.2, 0.3])
+    dymax = np.ones(3) * 0.1
+
+    for control0 in [(2, 1), (0, -1), (1, 1)]:
+        args = (argparser2(fun), None, y0, control0, dymax)
+        res = newtonxt(*args, args=(1, 1), bordered=True)
+        res_stacked = newtonxt(*args, args=(1, 1), bordered=False)
+
+        assert res.success
+        assert res.jac.shape == (2, 3)
+        assert res_stacked.jac.shape == (3, 3)
+        assert res.niterations == res_stacked.niterations
+        assert np.allclose(res.x, res_stacked.x)
+
+
+if __name__ == "__main__":
+    test_newtonxt_cache()
+    test_newtonxt_bordered()
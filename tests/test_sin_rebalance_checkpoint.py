@@ -0,0 +1,94 @@
+import os
+import tempfile
+
+import numpy as np
+
+import contique
+
+
+def fun(x, l, a, b):
+    return np.array([-(a + b * x[0]) * np.sin(x[0]) + l])
+
+
+def test_sin_rebalance_checkpoint():
+    # initial solution
+    x0 = np.zeros(1)
+    lpf0 = 0.0
+
+    # additional function arguments
+    a = 1
+    b = 0.3
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        args=(a, b),
+        lpf0=lpf0,
+        dxmax=0.2,
+        dlpfmax=0.2,
+        maxsteps=60,
+        maxcycles=4,
+        maxiter=8,
+        tol=1e-10,
+        overshoot=1.0,
+        rebalance=True,
+        increase=0.5,
+        decrease=2,
+        high=10,
+        predictor="secant",
+    )
+
+    # uninterrupted run
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ckpt = os.path.join(tmp, "run.ckpt")
+
+        # interrupted run with checkpoints every 7 steps
+        steps = []
+        for res in contique.solve(
+            checkpoint=ckpt,
+            checkpoint_every=7,
+            callback=lambda step, res: steps.append(step),
+            **kwargs,
+        ):
+            if len(steps) == 30:
+                break
+
+        state = contique.io.load_checkpoint(ckpt)
+        assert state["step"] % 7 == 0
+        assert state["y1"] is not None
+
+        # resumed run
+        Y = np.array([res.x for res in contique.solve(resume_from=ckpt, **kwargs)])
+
+    # the resumed run reproduces the uninterrupted run (bit for bit)
+    i = np.flatnonzero(np.all(X == state["y0"], axis=1))[0]
+    assert len(Y) > 0
+    assert np.array_equal(X[i + 1 :], Y)
+
+    # the adaptive step-width depends on the last three solutions
+    kwargs["rebalance"] = "adaptive"
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ckpt = os.path.join(tmp, "run.ckpt")
+
+        for step, res in enumerate(
+            contique.solve(checkpoint=ckpt, checkpoint_every=5, **kwargs)
+        ):
+            if step == 23:
+                break
+
+        state = contique.io.load_checkpoint(ckpt)
+        assert state["y2"] is not None
+
+        Y = np.array([res.x for res in contique.solve(resume_from=ckpt, **kwargs)])
+
+    i = np.flatnonzero(np.all(X == state["y0"], axis=1))[0]
+    assert len(Y) > 0
+    assert np.array_equal(X[i + 1 :], Y)
+
+
+if __name__ == "__main__":
+    test_sin_rebalance_checkpoint()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import contique
+from contique.numcont import adapt
+
+
+def fun(x, l, a, b):
+    return np.array([-a * np.sin(x[0]) + x[1] ** 2 + l, -b * np.cos(x[1]) * x[1] + l])
+
+
+def test_adapt():
+    x0 = np.ones(3)
+
+    # a step with a target number of iterations keeps the step-width
+    x, rebalanced, lastfailed = adapt(x0, x0, True, 4, lastfailed=5)
+    assert np.allclose(x, x0)
+
+    # fast convergence increases the step-width (limited by the max. increase)
+    x, rebalanced, lastfailed = adapt(x0, x0, True, 1, lastfailed=5, increase=0.5)
+    assert np.allclose(x, 1.5 * x0)
+
+    # ... but not after a recently failed step
+    x, rebalanced, lastfailed = adapt(x0, x0, True, 1, lastfailed=0)
+    assert np.allclose(x, x0)
+    assert lastfailed == 1
+
+    # a slow contraction, a bad predictor or a curved path decrease the step-width
+    for indicator in [dict(theta=1.0), dict(delta=0.5), dict(alpha=0.6)]:
+        x, rebalanced, lastfailed = adapt(x0, x0, True, 4, lastfailed=5, **indicator)
+        assert np.allclose(x, 0.5 * x0)
+
+    # a failed step
+    x, rebalanced, lastfailed = adapt(x0, x0, False, 8, lastfailed=5, decrease=2)
+    assert np.allclose(x, 0.5 * x0)
+    assert rebalanced
+    assert lastfailed == 0
+
+    # min. step-width
+    x, rebalanced, lastfailed = adapt(x0, x0, False, 8, lastfailed=5, low=1)
+    assert not rebalanced
+
+
+def test_sincos_adaptive():
+    # initial solution
+    x0 = np.zeros(2)
+    lpf0 = 0.0
+
+    # additional function arguments
+    a, b = 1, 1
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        args=(a, b),
+        lpf0=lpf0,
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=400,
+        maxiter=20,
+        tol=1e-8,
+        overshoot=1.05,
+        reporter=None,
+    )
+
+    def evaluate(rebalance, predictor):
+        "Return the residual calls per unit arc-length and the path."
+        profiler = contique.Profiler()
+        Res = contique.solve(
+            rebalance=rebalance, predictor=predictor, profile=profiler, **kwargs
+        )
+        path = contique.ContinuationPath(Res)
+        arclength = np.sum(np.linalg.norm(np.diff(path.y, axis=0), axis=1))
+        return profiler.counts["residual"] / arclength, path
+
+    # the first contraction rate starts from the tangent or the secant predictor
+    for predictor in [None, "secant"]:
+        uniform, path_uniform = evaluate(True, predictor)
+        adaptive, path_adaptive = evaluate("adaptive", predictor)
+
+        # fewer residual calls per unit arc-length
+        assert adaptive < uniform
+        assert np.all(path_adaptive.residual_norm[1:] < 1e-8)
+
+    with pytest.raises(ValueError):
+        list(contique.solve(rebalance="uniform", **kwargs))
+
+
+if __name__ == "__main__":
+    test_adapt()
+    test_sincos_adaptive()
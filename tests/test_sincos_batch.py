@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import contique
+
+
+def fun(x, l, a, b):
+    return np.array([-a * np.sin(x[0]) + x[1] ** 2 + l, -b * np.cos(x[1]) * x[1] + l])
+
+
+def test_sincos_batch():
+    # parameter sets
+    K = 6
+    a = np.linspace(0.8, 1.2, K)
+    b = 1.0
+
+    kwargs = dict(
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=75,
+        maxcycles=4,
+        maxiter=20,
+        tol=1e-10,
+        overshoot=1.05,
+    )
+
+    # lock-step continuation of all parameter sets
+    paths = contique.solve_batch(
+        fun, np.zeros((K, 2)), 0.0, args=(a, b), batched=(0,), **kwargs
+    )
+
+    assert len(paths) == K
+
+    # the paths of the members are equal to the paths of single continuations
+    for k, path in enumerate(paths):
+        Res = list(
+            contique.solve(
+                fun, np.zeros(2), 0.0, args=(a[k], b), reporter=None, **kwargs
+            )
+        )
+        X = np.array([res.x for res in Res])
+
+        assert path.y.shape == X.shape
+        assert np.allclose(path.y, X)
+        assert np.all(path.status[1:] == 1)
+        assert np.all(path.residual_norm[1:] < 1e-10)
+        assert path[-1].control == tuple(Res[-1].control)
+
+    # members with failed Newton-iterations are stopped without stopping the others
+    paths = contique.solve_batch(
+        fun,
+        np.zeros((2, 2)),
+        0.0,
+        args=(np.array([1.0, 1.0]), np.array([1.0, np.nan])),
+        batched=(0, 1),
+        **kwargs,
+    )
+
+    assert len(paths[0]) == 76
+    assert len(paths[1]) == 1
+
+    # a shared argument with a length equal to the number of members is not batched
+    def fun_shared(x, l, a, c):
+        return fun(x, l, a, np.sum(c))
+
+    K = 3
+    a = np.array([0.8, 1.0, 1.2])
+    c = np.array([0.5, 0.5, 0.0])
+
+    paths = contique.solve_batch(
+        fun_shared, np.zeros((K, 2)), 0.0, args=(a, c), batched=(0,), **kwargs
+    )
+
+    for k, path in enumerate(paths):
+        Res = contique.solve(
+            fun, np.zeros(2), 0.0, args=(a[k], 1.0), reporter=None, **kwargs
+        )
+        X = np.array([res.x for res in Res])
+
+        assert np.allclose(path.y, X)
+
+    with pytest.raises(ValueError):
+        contique.solve_batch(fun, np.zeros((K, 2)), 0.0, args=(a, b), batched=(1,))
+
+
+if __name__ == "__main__":
+    test_sincos_batch()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import contique
+
+
+def fun(x, l, a, b):
+    return np.array([-a * np.sin(x[0]) + x[1] ** 2 + l, -b * np.cos(x[1]) * x[1] + l])
+
+
+def test_sincos_predictor():
+    # initial solution
+    x0 = np.zeros(2)
+    lpf0 = 0.0
+
+    # additional function arguments
+    a, b = 1, 1
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        args=(a, b),
+        lpf0=lpf0,
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=75,
+        maxcycles=4,
+        maxiter=20,
+        tol=1e-10,
+        overshoot=1.0,
+    )
+
+    # numeric continuation
+    Res = list(contique.solve(**kwargs))
+    X = np.array([res.x for res in Res])
+
+    for predictor in ["secant"]:
+        Res_predictor = list(contique.solve(predictor=predictor, **kwargs))
+        Y = np.array([res.x for res in Res_predictor])
+
+        assert np.allclose(X, Y)
+        assert sum([res.niterations for res in Res_predictor]) < sum(
+            [res.niterations for res in Res]
+        )
+
+    # the first cycle continues from the pre-identification iterate and re-cycles
+    # are warm-started (the first iteration at the base point is not repeated)
+    assert sum([res.niterations for res in Res]) < 2.5 * len(Res)
+
+    for predictor in ["tangent", "quadratic"]:
+        with pytest.raises(ValueError):
+            next(contique.solve(predictor=predictor, **kwargs))
+
+
+if __name__ == "__main__":
+    test_sincos_predictor()
@@ -0,0 +1,101 @@
+import io
+import logging
+from contextlib import redirect_stdout
+
+import numpy as np
+import pytest
+
+import contique
+
+
+def fun(x, l, a, b):
+    return np.array([-a * np.sin(x[0]) + x[1] ** 2 + l, -b * np.cos(x[1]) * x[1] + l])
+
+
+class Handler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_sincos_reporter():
+    # initial solution
+    x0 = np.zeros(2)
+    lpf0 = 0.0
+
+    # additional function arguments
+    a, b = 1, 1
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        args=(a, b),
+        lpf0=lpf0,
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=75,
+        maxcycles=4,
+        maxiter=20,
+        tol=1e-10,
+        overshoot=1.0,
+    )
+
+    # default table
+    with redirect_stdout(io.StringIO()) as out:
+        X = np.array([res.x for res in contique.solve(**kwargs)])
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("|Step,C.|")
+
+    # silent
+    with redirect_stdout(io.StringIO()) as out:
+        Y = np.array([res.x for res in contique.solve(reporter=None, **kwargs)])
+
+    assert out.getvalue() == ""
+    assert np.array_equal(X, Y)
+
+    # structured records
+    records = []
+    Y = np.array([res.x for res in contique.solve(reporter=records.append, **kwargs)])
+
+    assert np.array_equal(X, Y)
+    assert len(records) == len(lines) - 2
+    assert records[0]["step"] == 1
+    assert records[0]["cycle"] == 1
+    assert set(records[0]) == {
+        "event",
+        "step",
+        "cycle",
+        "control0",
+        "control",
+        "norm",
+        "niterations",
+        "status",
+        "overshoot",
+    }
+    assert [r["step"] for r in records if r["cycle"] == 1] == list(range(1, len(X)))
+
+    # logger
+    logger = logging.getLogger("contique.test")
+    logger.setLevel(logging.INFO)
+    handler = Handler()
+    logger.addHandler(handler)
+
+    with redirect_stdout(io.StringIO()) as out:
+        Y = np.array([res.x for res in contique.solve(reporter=logger, **kwargs)])
+
+    logger.removeHandler(handler)
+
+    assert out.getvalue() == ""
+    assert np.array_equal(X, Y)
+    assert [r.contique for r in handler.records] == records
+
+    with pytest.raises(ValueError):
+        list(contique.solve(reporter="json", **kwargs))
+
+
+if __name__ == "__main__":
+    test_sincos_reporter()
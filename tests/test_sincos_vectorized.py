@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import contique
+
+
+def fun(x, l, a, b):
+    return np.array([-a * np.sin(x[0]) + x[1] ** 2 + l, -b * np.cos(x[1]) * x[1] + l])
+
+
+def test_sincos_jacobian_vectorized():
+    x = np.array([0.3, -0.2])
+    lpf = 0.1
+
+    for mode in [2, 3]:
+        dfdx = contique.jacobian(fun, mode=mode)(x, lpf, 1, 1)
+        dfdx_vectorized = contique.jacobian(fun, mode=mode, vectorized=True)
+        assert np.allclose(dfdx_vectorized(x, lpf, 1, 1), dfdx)
+
+        dfdl = contique.jacobian(fun, argnum=1, mode=mode)(x, lpf, 1, 1)
+        dfdl_vectorized = contique.jacobian(fun, argnum=1, mode=mode, vectorized=True)
+        assert np.allclose(dfdl_vectorized(x, lpf, 1, 1), dfdl)
+
+
+def test_sincos_vectorized():
+    # initial solution
+    x0 = np.zeros(2)
+    lpf0 = 0.0
+
+    # additional function arguments
+    a, b = 1, 1
+
+    kwargs = dict(
+        fun=fun,
+        x0=x0,
+        args=(a, b),
+        lpf0=lpf0,
+        dxmax=0.1,
+        dlpfmax=0.1,
+        maxsteps=75,
+        maxcycles=4,
+        maxiter=20,
+        tol=1e-10,
+        overshoot=1.0,
+    )
+
+    # numeric continuation
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+    Y = np.array([res.x for res in contique.solve(vectorized=True, **kwargs)])
+
+    assert np.allclose(X, Y)
+
+
+if __name__ == "__main__":
+    test_sincos_jacobian_vectorized()
+    test_sincos_vectorized()
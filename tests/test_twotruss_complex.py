@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import contique
+
+
+def fun(x, lpf, a, L, EA):
+    WL = -x[0] / L
+    lL = np.sqrt(1 - 2 * np.sin(a) * WL + WL**2)
+    N = EA * (lL - 1)
+    return np.array([2 * N * (np.sin(a) - WL) + lpf])
+
+
+def test_twotruss_jacobian_complex():
+    x = np.array([0.3])
+    lpf = 0.1
+    args = (np.deg2rad(45), np.sqrt(2), 1)
+
+    for argnum, arg in [(0, x), (1, lpf)]:
+        jac = contique.jacobian(fun, argnum=argnum, mode=3)(x, lpf, *args)
+        jac_complex = contique.jacobian(fun, argnum=argnum, mode="complex")
+        jac_complex_vectorized = contique.jacobian(
+            fun, argnum=argnum, mode="complex", vectorized=True
+        )
+
+        assert np.allclose(jac_complex(x, lpf, *args), jac)
+        assert np.allclose(jac_complex_vectorized(x, lpf, *args), jac)
+
+
+def test_twotruss_complex():
+    # initial solution
+    x0 = np.zeros(1)
+    lpf0 = 0.0
+
+    # args
+    L = np.sqrt(2)
+    a = np.deg2rad(45)
+    EA = 1
+
+    # numeric continuation
+    kwargs = dict(fun=fun, x0=x0, lpf0=lpf0, args=(a, L, EA))
+    X = np.array([res.x for res in contique.solve(**kwargs)])
+    Y = np.array([res.x for res in contique.solve(jacmode="complex", **kwargs)])
+
+    assert np.allclose(X, Y)
+
+
+if __name__ == "__main__":
+    test_twotruss_jacobian_complex()
+    test_twotruss_complex()
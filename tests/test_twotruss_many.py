@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import contique
+
+
+def fun(x, lpf, a, L, EA):
+    WL = -x[0] / L
+    lL = np.sqrt(1 - 2 * np.sin(a) * WL + WL**2)
+    N = EA * (lL - 1)
+    return np.array([2 * N * (np.sin(a) - WL) + lpf])
+
+
+def fun_shared(x, lpf, a, L, EA, table):
+    # a large shared (read-only) array
+    assert not table.flags.writeable
+    return fun(x, lpf, a, L, table[EA])
+
+
+def test_twotruss_many():
+    # initial solution
+    x0 = np.zeros(1)
+    lpf0 = 0.0
+
+    # args
+    L = np.sqrt(2)
+    angles = np.deg2rad([30, 45, 60])
+    args_list = [(a, L, 1) for a in angles]
+
+    kwargs = dict(dxmax=0.05, dlpfmax=0.05, maxsteps=40, reporter=None)
+
+    # reference solutions
+    X = [
+        np.array([res.x for res in contique.solve(fun, x0, lpf0, args=args, **kwargs)])
+        for args in args_list
+    ]
+
+    for workers in [1, 2]:
+        # a failed continuation (invalid arguments) does not stop the others
+        paths = contique.solve_many(
+            fun, x0, lpf0, [*args_list, (0.5, L, "EA")], workers=workers, **kwargs
+        )
+
+        assert len(paths) == 4
+        assert isinstance(paths[-1], TypeError)
+
+        # compact paths in the order of the arguments
+        for path, x in zip(paths[:-1], X):
+            assert isinstance(path, contique.ContinuationPath)
+            assert np.array_equal(path.y, x)
+
+    # large arrays are passed by shared memory
+    table = np.ones(1000)
+    args_list = [(a, L, 7) for a in angles]
+    paths = contique.solve_many(
+        fun_shared, x0, lpf0, args_list, workers=2, shared=(table,), **kwargs
+    )
+
+    for path, x in zip(paths, X):
+        assert np.array_equal(path.y, x)
+
+
+if __name__ == "__main__":
+    test_twotruss_many()